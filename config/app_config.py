@@ -3,4 +3,4 @@ APP_NAME = "Yofardev Toolbox"
 APP_VERSION = "v1.2.0"
 WINDOW_SIZE = "1200x850"
 SCRIPTS_DIR = "scripts"
-SKIP_FILES = {"llm_generator.py", "__init__.py"}
+SKIP_FILES = {"llm_generator.py", "__init__.py", "image_files.py"}
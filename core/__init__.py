@@ -2,7 +2,17 @@
 from .script_manager import ScriptManager
 from .script_executor import ScriptExecutor
 from .file_handler import FileHandler
-from .llm_generator import ScriptGenerator, GenerationError, APIError, ValidationError
+
+_LLM_NAMES = {"ScriptGenerator", "GenerationError", "APIError", "ValidationError"}
+
+
+def __getattr__(name):
+    # The LLM generator pulls in requests; only import it when one of its names is used
+    if name in _LLM_NAMES:
+        from . import llm_generator
+        return getattr(llm_generator, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "ScriptManager",
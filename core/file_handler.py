@@ -2,7 +2,7 @@
 import os
 from tkinter import filedialog
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Iterator, List, Tuple, Optional
 
 
 class FileHandler:
@@ -55,6 +55,45 @@ class FileHandler:
                     images.append(full_path)
         return images
 
+    def iter_images_from_folder(self, folder: str, extensions: List[str]) -> Iterator[str]:
+        """
+        Recursively yield images in a folder, in the same order as get_images_from_folder.
+
+        Uses os.scandir, so the entry type comes from the directory listing instead
+        of a stat per file, and the first paths are available before the walk ends.
+
+        Args:
+            folder: Path to the folder
+            extensions: List of valid file extensions (e.g., [".jpg", ".png"])
+
+        Yields:
+            Image file paths
+        """
+        # Same suffix test as get_images_from_folder (str.endswith takes a tuple)
+        exts = tuple(ext.lower() for ext in extensions)
+        pending = [folder]
+        while pending:
+            current = pending.pop()
+            subdirs = []
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        try:
+                            is_dir = entry.is_dir()
+                        except OSError:
+                            is_dir = False
+                        if is_dir:
+                            # Like os.walk: list symlinked folders but don't descend into them
+                            if not entry.is_symlink():
+                                subdirs.append(entry.path)
+                        elif not exts or entry.name.lower().endswith(exts):
+                            yield entry.path
+            except OSError:
+                # Listing failed partway; still walk the subfolders found before the error
+                pass
+            # Reversed so the first subfolder is walked next
+            pending.extend(reversed(subdirs))
+
     def parse_input_types(self, input_str: str) -> List[Tuple[str, str]]:
         """
         Parse INPUT_TYPES string into filetypes format.
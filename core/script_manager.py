@@ -90,6 +90,20 @@ class ScriptManager:
         Uses AST parsing to extract metadata without importing modules,
         which avoids ImportError when dependencies are missing.
 
+        Returns:
+            List of script dictionaries with metadata
+        """
+        scripts = self.scan_scripts()
+        self._scripts_cache = scripts
+        return scripts
+
+    def scan_scripts(self) -> List[Dict]:
+        """
+        Discover scripts without touching the manager's cache.
+
+        Safe to call from a worker thread; hand the result to set_scripts()
+        on the UI thread.
+
         Returns:
             List of script dictionaries with metadata
         """
@@ -111,9 +125,17 @@ class ScriptManager:
                     if metadata:
                         scripts.append(metadata)
 
-        self._scripts_cache = scripts
         return scripts
 
+    def set_scripts(self, scripts: List[Dict]):
+        """
+        Replace the cached scripts with a list from scan_scripts().
+
+        Args:
+            scripts: List of script dictionaries
+        """
+        self._scripts_cache = scripts
+
     def get_script_by_name(self, name: str) -> Optional[Dict]:
         """
         Get a script by its display name.
@@ -3,46 +3,70 @@ import os
 import sys
 import datetime
 import numpy as np
-from PIL import Image, ImageFilter, ImageEnhance
+import cv2
+from PIL import Image, ImageEnhance
 
+# The blend helpers work on flat 1D views so the ufuncs run over one contiguous
+# buffer instead of iterating the short trailing channel axis
 def color_dodge_blend(base, blend, opacity=1.0):
-    base_array = np.array(base, dtype=np.float32) / 255.0
-    blend_array = np.array(blend, dtype=np.float32) / 255.0
+    base_input = np.asarray(base)
+    base_array = base_input.reshape(-1).astype(np.float32) / 255.0
+    blend_array = np.asarray(blend).reshape(-1).astype(np.float32) / 255.0
     blend_array = np.clip(blend_array, 0, 0.999)
     result = base_array / (1.0 - blend_array)
     result = np.clip(result, 0, 1)
     if opacity < 1.0:
         result = base_array * (1 - opacity) + result * opacity
-    return (result * 255).astype(np.uint8)
+    return (result * 255).astype(np.uint8).reshape(base_input.shape)
 
 def lighten_blend(base, blend, opacity=1.0):
-    base_array = np.array(base, dtype=np.float32)
-    blend_array = np.array(blend, dtype=np.float32)
+    base_input = np.asarray(base)
+    base_array = base_input.reshape(-1).astype(np.float32)
+    blend_array = np.asarray(blend).reshape(-1).astype(np.float32)
     result = np.maximum(base_array, blend_array)
     if opacity < 1.0:
         result = base_array * (1 - opacity) + result * opacity
-    return Image.fromarray(result.astype(np.uint8))
-
-def add_uniform_noise(image, amount=30):
-    img_array = np.array(image)
-    noise = np.random.uniform(-1, 1, img_array.shape) * (amount / 100.0) * 255
-    noisy = img_array.astype(np.float32) + noise
-    noisy = np.clip(noisy, 0, 255)
-    return Image.fromarray(noisy.astype(np.uint8))
-
-def apply_glow_effect(image, blur_radius=8, opacity=0.35):
-    duplicate = image.copy()
-    blurred_duplicate = duplicate.filter(ImageFilter.GaussianBlur(radius=blur_radius))
-    result_image = lighten_blend(image, blurred_duplicate, opacity)
+    return result.astype(np.uint8).reshape(base_input.shape)
+
+def uniform_noise_layer(width, height, amount=30):
+    # Uniform noise over a black layer: only the positive half survives the clip,
+    # so build it directly instead of going through a black PIL image
+    # Drawn directly in float32 in [0, 1), then mapped to [-1, 1) in place
+    noise = np.random.default_rng().random(height * width * 3, dtype=np.float32)
+    noise *= 2
+    noise -= 1
+    noise *= (amount / 100.0) * 255
+    return np.clip(noise, 0, 255).astype(np.uint8).reshape(height, width, 3)
+
+def gaussian_kernel(blur_radius):
+    # Same sigma as PIL's GaussianBlur(radius); built once and shared by the whole batch
+    sigma = float(blur_radius)
+    size = int(sigma * 4) * 2 + 1
+    return cv2.getGaussianKernel(size, sigma, cv2.CV_32F)
+
+def apply_glow_effect(image, blur_radius=8, opacity=0.35, kernel=None):
+    if kernel is None:
+        kernel = gaussian_kernel(blur_radius)
+    image_array = np.asarray(image)
+    blurred_array = cv2.sepFilter2D(image_array, -1, kernel, kernel)
+    result_image = lighten_blend(image_array, blurred_array, opacity)
     return result_image
 
 def apply_noise_effect(image, noise_amount=30, opacity=0.45):
-    width, height = image.size
-    black_layer = Image.new("RGB", (width, height), (0, 0, 0))
-    noisy_black = add_uniform_noise(black_layer, noise_amount)
-    result_array = color_dodge_blend(image, noisy_black, opacity)
-    result_image = Image.fromarray(result_array)
-    return result_image
+    image_array = np.asarray(image)
+    height, width = image_array.shape[:2]
+    noisy_black = uniform_noise_layer(width, height, noise_amount)
+    result_array = color_dodge_blend(image_array, noisy_black, opacity)
+    return result_array
+
+def save_result(output_path, result_array):
+    # OpenCV encodes with libjpeg-turbo and skips the final Image.fromarray copy
+    bgr_array = cv2.cvtColor(result_array, cv2.COLOR_RGB2BGR)
+    encode_params = []
+    if output_path.lower().endswith((".jpg", ".jpeg")):
+        encode_params = [cv2.IMWRITE_JPEG_QUALITY, 95, cv2.IMWRITE_JPEG_OPTIMIZE, 0]
+    if not cv2.imwrite(output_path, bgr_array, encode_params):
+        raise IOError(f"Could not write {output_path}")
 
 def apply_vibrance_saturation_boost(image, vibrance_boost=0.10, saturation_boost=0.10):
     enhancer = ImageEnhance.Color(image)
@@ -76,26 +100,32 @@ def process_images(
     os.makedirs(output_folder, exist_ok=True)
 
     timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+    glow_kernel = gaussian_kernel(blur_radius)
 
     for input_path in image_paths:
         try:
-            original = Image.open(input_path).convert("RGB")
+            original = Image.open(input_path)
+            original.load()
+            # JPEGs are usually RGB already; skip the extra copy in that case
+            if original.mode != "RGB":
+                original = original.convert("RGB")
             filename = os.path.basename(input_path)
             name, ext = os.path.splitext(filename)
             
             if effect_type == "glow":
                 output_path = os.path.join(output_folder, f"{name}_{timestamp}_glow{ext}")
-                result_image = apply_glow_effect(original, blur_radius, lighten_opacity)
+                result_array = apply_glow_effect(original, blur_radius, lighten_opacity, glow_kernel)
             elif effect_type == "noise":
                 output_path = os.path.join(output_folder, f"{name}_{timestamp}_noise{ext}")
-                result_image = apply_noise_effect(original, noise_amount, dodge_opacity)
+                result_array = apply_noise_effect(original, noise_amount, dodge_opacity)
             else: # combined
                 output_path = os.path.join(output_folder, f"{name}_{timestamp}_combined{ext}")
-                first_result = apply_glow_effect(original, blur_radius, lighten_opacity)
+                first_result = apply_glow_effect(original, blur_radius, lighten_opacity, glow_kernel)
                 second_result = apply_noise_effect(first_result, noise_amount, dodge_opacity)
-                result_image = apply_vibrance_saturation_boost(second_result, vibrance_boost, saturation_boost)
+                result_image = apply_vibrance_saturation_boost(Image.fromarray(second_result), vibrance_boost, saturation_boost)
+                result_array = np.asarray(result_image)
 
-            result_image.save(output_path, quality=95)
+            save_result(output_path, result_array)
             print(f"Effect '{effect_type}' applied: {input_path} -> {output_path}")
 
         except Exception as e:
@@ -0,0 +1,45 @@
+"""
+Shared image file discovery for the scripts in this folder.
+Not a script itself: listed in SKIP_FILES so the UI doesn't show it.
+"""
+import os
+from pathlib import Path
+
+IMAGE_EXTENSIONS = frozenset(('png', 'jpg', 'jpeg', 'webp', 'bmp', 'tiff'))
+
+
+def walk_image_files(directory):
+    """
+    Yield image paths under a directory. os.scandir reuses the directory
+    entry type info, and the extension is checked on the plain name before
+    any Path object is built. Unreadable folders are skipped.
+    """
+    try:
+        entries = os.scandir(directory)
+    except OSError:
+        return
+    with entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from walk_image_files(entry.path)
+            else:
+                _, dot, ext = entry.name.rpartition('.')
+                if dot and ext.lower() in IMAGE_EXTENSIONS:
+                    yield Path(entry.path)
+
+
+def get_image_files(paths):
+    """
+    Recursively finds image files if a folder is passed,
+    or returns the path if it's a file.
+    """
+    images = []
+
+    for path_str in paths:
+        path = Path(path_str)
+        if path.is_file():
+            if path.suffix.lower().lstrip('.') in IMAGE_EXTENSIONS:
+                images.append(path)
+        elif path.is_dir():
+            images.extend(walk_image_files(path))
+    return images
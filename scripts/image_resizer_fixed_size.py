@@ -2,6 +2,8 @@ import os
 import datetime
 import argparse
 from pathlib import Path
+import numpy as np
+import cv2
 from PIL import Image
 
 # --- Core Components for UI ---
@@ -64,8 +66,20 @@ def process_files(file_paths, **kwargs):
                 filename = os.path.basename(file_path)
                 save_path = os.path.join(output_folder_path, filename)
                 
-                # Save the image
-                resized_img.save(save_path)
+                # Save the image (OpenCV's libjpeg-turbo encoder is faster than PIL's)
+                encode_params = []
+                if save_path.lower().endswith((".jpg", ".jpeg")):
+                    encode_params = [cv2.IMWRITE_JPEG_QUALITY, 95, cv2.IMWRITE_JPEG_OPTIMIZE, 0]
+                if resized_img.mode == "RGB":
+                    bgr_array = cv2.cvtColor(np.asarray(resized_img), cv2.COLOR_RGB2BGR)
+                    saved = cv2.imwrite(save_path, bgr_array, encode_params)
+                elif resized_img.mode == "L":
+                    saved = cv2.imwrite(save_path, np.asarray(resized_img), encode_params)
+                else:
+                    resized_img.save(save_path)
+                    saved = True
+                if not saved:
+                    raise IOError(f"Could not write {save_path}")
                 print(f"Processed: {filename}")
         except Exception as e:
             print(f"Error processing {file_path}: {e}")
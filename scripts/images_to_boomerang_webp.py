@@ -23,6 +23,18 @@ PARAMETERS = [
         "default": 0,
         "description": "Number of times to loop (0 for infinite)"
     },
+    {
+        "name": "quality",
+        "type": "int",
+        "default": 80,
+        "description": "WebP quality (0-100)"
+    },
+    {
+        "name": "method",
+        "type": "int",
+        "default": 4,
+        "description": "Encoder effort (0-6). 6 compresses best but is much slower, use it for archival"
+    },
     {
         "name": "output_filename",
         "type": "str",
@@ -55,6 +67,8 @@ def process_files(file_paths, **kwargs):
     # 2. Get parameters
     duration = kwargs.get("duration", 100)
     loop = kwargs.get("loop", 0)
+    quality = kwargs.get("quality", 80)
+    method = kwargs.get("method", 4)
     output_filename = kwargs.get("output_filename", "boomerang_animation.webp")
     if not output_filename.endswith(".webp"):
         output_filename += ".webp"
@@ -98,7 +112,8 @@ def process_files(file_paths, **kwargs):
         duration=duration,
         loop=loop,
         format="WEBP",
-        method=6, # Highest quality compression
+        quality=quality,
+        method=method,
         lossless=False
     )
 
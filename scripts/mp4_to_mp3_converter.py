@@ -2,6 +2,9 @@ import os
 import datetime
 import argparse
 import subprocess
+import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 # --- Core Components for UI ---
 
@@ -16,6 +19,105 @@ PARAMETERS = [
 
 # --- Script Logic ---
 
+FFMPEG_PATH = "/opt/homebrew/bin/ffmpeg"
+FFPROBE_PATH = "/opt/homebrew/bin/ffprobe"
+
+
+def probe_audio_stream(file_path):
+    """
+    Read codec, sample rate, channel count and bitrate of the first audio stream.
+
+    Returns:
+        Dict with the stream info, or None if ffprobe is unavailable or fails
+    """
+    probe_command = [
+        FFPROBE_PATH,
+        "-v", "error",
+        "-select_streams", "a:0",
+        "-show_entries", "stream=codec_name,sample_rate,channels,bit_rate",
+        "-of", "json",
+        file_path
+    ]
+    try:
+        result = subprocess.run(probe_command, check=True, capture_output=True, text=True)
+        streams = json.loads(result.stdout).get("streams", [])
+        return streams[0] if streams else None
+    except (subprocess.CalledProcessError, FileNotFoundError, ValueError):
+        return None
+
+
+def parse_bitrate(bitrate):
+    """
+    Convert an ffmpeg bitrate string ("192k", "1M", "128000") to bits per second.
+
+    Returns:
+        Bitrate as an int, or None if it can't be parsed
+    """
+    multipliers = {"k": 1000, "m": 1000000}
+    text = str(bitrate).strip().lower()
+    try:
+        if text and text[-1] in multipliers:
+            return int(float(text[:-1]) * multipliers[text[-1]])
+        return int(float(text))
+    except ValueError:
+        return None
+
+
+def convert_file(file_path, output_folder_path, bitrate, samplerate, channels):
+    """
+    Convert a single MP4 file to MP3. Runs in a worker thread.
+
+    Returns:
+        Message describing the result
+    """
+    # Get the base filename without extension
+    filename = os.path.basename(file_path)
+    name_without_ext = os.path.splitext(filename)[0]
+    output_path = os.path.join(output_folder_path, f"{name_without_ext}.mp3")
+    
+    # If the audio is already MP3 at the requested format and no higher than the
+    # requested bitrate, remux it instead of re-encoding
+    stream = probe_audio_stream(file_path)
+    requested_bitrate = parse_bitrate(bitrate)
+    stream_bitrate = parse_bitrate(stream.get("bit_rate", "")) if stream else None
+    copy_stream = (
+        stream is not None
+        and stream.get("codec_name") == "mp3"
+        and str(stream.get("sample_rate")) == str(samplerate)
+        and stream.get("channels") == channels
+        and requested_bitrate is not None
+        and stream_bitrate is not None
+        and stream_bitrate <= requested_bitrate
+    )
+    if copy_stream:
+        codec_args = ["-acodec", "copy"]      # Container-only remux
+    else:
+        codec_args = [
+            "-acodec", "libmp3lame",   # Use MP3 codec
+            "-b:a", bitrate,           # Audio bitrate
+            "-ar", str(samplerate),    # Audio sample rate
+            "-ac", str(channels),      # Audio channels
+        ]
+    
+    # Run ffmpeg command
+    try:
+        ffmpeg_command = [
+            FFMPEG_PATH,
+            "-i", file_path,           # Input file
+            "-vn",                     # No video
+            *codec_args,
+            "-y",                      # Overwrite output files without asking
+            output_path                # Output file
+        ]
+        
+        subprocess.run(ffmpeg_command, check=True, capture_output=True)
+        mode = " (stream copy)" if copy_stream else ""
+        return f"   ✓ Saved to: {output_path}{mode}"
+        
+    except subprocess.CalledProcessError as e:
+        return f"   ✗ Error converting {filename}: {e.stderr.decode()}"
+
+
 def process_files(file_paths, bitrate, samplerate, channels):
     """
     Converts MP4 files to MP3 format using ffmpeg.
@@ -39,38 +141,23 @@ def process_files(file_paths, bitrate, samplerate, channels):
     print(f"Channels: {channels}")
     print(f"Output will be saved to: {output_folder_path}")
 
-    for file_path in file_paths:
-        # 2. Process each file
-        print(f"-> Converting {file_path}")
-        
-        # Get the base filename without extension
-        filename = os.path.basename(file_path)
-        name_without_ext = os.path.splitext(filename)[0]
-        output_path = os.path.join(output_folder_path, f"{name_without_ext}.mp3")
-        
-        # 3. Run ffmpeg command
-        try:
-            ffmpeg_command = [
-                "/opt/homebrew/bin/ffmpeg",
-                "-i", file_path,           # Input file
-                "-vn",                     # No video
-                "-acodec", "libmp3lame",   # Use MP3 codec
-                "-b:a", bitrate,           # Audio bitrate
-                "-ar", str(samplerate),    # Audio sample rate
-                "-ac", str(channels),      # Audio channels
-                "-y",                      # Overwrite output files without asking
-                output_path                # Output file
-            ]
-            
-            subprocess.run(ffmpeg_command, check=True, capture_output=True)
-            print(f"   ✓ Saved to: {output_path}")
-            
-        except subprocess.CalledProcessError as e:
-            print(f"   ✗ Error converting {filename}: {e.stderr.decode()}")
-        except FileNotFoundError:
-            print("   ✗ Error: ffmpeg not found at /opt/homebrew/bin/ffmpeg")
-            print("      Please install ffmpeg: brew install ffmpeg")
-            break
+    if not os.path.exists(FFMPEG_PATH):
+        print(f"   ✗ Error: ffmpeg not found at {FFMPEG_PATH}")
+        print("      Please install ffmpeg: brew install ffmpeg")
+        return
+
+    # 2. Convert files concurrently: each ffmpeg process runs on its own core
+    worker = partial(
+        convert_file,
+        output_folder_path=output_folder_path,
+        bitrate=bitrate,
+        samplerate=samplerate,
+        channels=channels,
+    )
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        for file_path, message in zip(file_paths, executor.map(worker, file_paths)):
+            print(f"-> Converting {file_path}")
+            print(message)
 
     print("Processing complete.")
 
@@ -1,10 +1,19 @@
 import os
+import queue
 import datetime
 import argparse
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 # Import any external packages you need
 import fitz  # PyMuPDF - requires: pip install pymupdf
+from PIL import Image
+
+# PNG encoding is handed off to these threads so zlib runs alongside MuPDF rendering
+PNG_ENCODER_THREADS = 2
+PNG_QUEUE_SIZE = 8
+PNG_COMPRESS_LEVEL = 1
 
 # --- Core Components for UI ---
 
@@ -25,6 +34,12 @@ PARAMETERS = [
         "default": 300,
         "description": "Resolution in DPI (higher = better quality but larger files)"
     },
+    {
+        "name": "jpeg_quality",
+        "type": "int",
+        "default": 85,
+        "description": "JPEG quality (1-100), only used for JPEG output"
+    },
     {
         "name": "start_page",
         "type": "int",
@@ -47,6 +62,110 @@ PARAMETERS = [
 
 # --- Script Logic ---
 
+def encode_png_worker(png_queue, dpi, saved, errors):
+    '''
+    Consume (page_num, output_path, width, height, samples) items and write them as PNGs.
+
+    Only raw bytes cross the queue, so the fitz objects stay on the render
+    thread. Level-1 zlib is several times faster than the default level 6 for
+    a ~10% larger file, and zlib releases the GIL while it compresses.
+    '''
+    while True:
+        item = png_queue.get()
+        if item is None:
+            return
+        page_num, output_path, width, height, samples = item
+        try:
+            img = Image.frombuffer("RGB", (width, height), samples, "raw", "RGB", 0, 1)
+            img.save(output_path, "PNG", compress_level=PNG_COMPRESS_LEVEL, dpi=(dpi, dpi))
+            saved.append((page_num, os.path.basename(output_path)))
+        except Exception as e:
+            errors.append(f"{os.path.basename(output_path)}: {e}")
+
+
+def convert_pages(file_path, page_numbers, output_folder_path, output_ext, dpi, jpeg_quality, prefix):
+    '''
+    Render a contiguous range of pages of one PDF. Runs in a worker process.
+
+    PyMuPDF is not thread-safe, so pages are split across processes and each
+    worker opens its own copy of the document. PNG pages are handed to a small
+    pool of encoder threads instead of being compressed on the render loop.
+
+    Returns:
+        Tuple of (pages_saved, log_lines, error) so the parent does all the printing
+    '''
+    saved = []  # (page_num, filename) of pages actually written, appended by whichever thread wrote them
+    encoder_errors = []
+    encoders = []
+    png_queue = None
+    if output_ext == "png":
+        # Bounded queue: rendering can run at most PNG_QUEUE_SIZE pages ahead of encoding
+        png_queue = queue.Queue(maxsize=PNG_QUEUE_SIZE)
+        encoders = [
+            threading.Thread(target=encode_png_worker, args=(png_queue, dpi, saved, encoder_errors), daemon=True)
+            for _ in range(PNG_ENCODER_THREADS)
+        ]
+        for encoder in encoders:
+            encoder.start()
+    
+    try:
+        pdf_doc = fitz.open(file_path)
+        pdf_name = os.path.splitext(os.path.basename(file_path))[0]
+        mat = fitz.Matrix(dpi/72.0, dpi/72.0)  # Built once, shared by every page
+        
+        for page_num in page_numbers:
+            page = pdf_doc.load_page(page_num)
+            
+            # Create output filename
+            page_num_display = page_num + 1
+            if prefix:
+                output_filename = f"{prefix}_{pdf_name}_page_{page_num_display}.{output_ext}"
+            else:
+                output_filename = f"{pdf_name}_page_{page_num_display}.{output_ext}"
+            
+            output_path = os.path.join(output_folder_path, output_filename)
+            
+            # alpha=False is required: the PNG queue wraps the samples with frombuffer as tightly
+            # packed RGB (stride = width * 3), which an RGBA pixmap would break
+            pix = page.get_pixmap(matrix=mat, colorspace=fitz.csRGB, alpha=False)
+            if png_queue is not None:
+                # Stride equals width * 3 with alpha=False, so samples is tightly packed
+                png_queue.put((page_num, output_path, pix.width, pix.height, pix.samples))
+            else:
+                pix.set_dpi(dpi, dpi)
+                with open(output_path, "wb") as f:
+                    f.write(pix.tobytes(output_ext, jpg_quality=jpeg_quality))
+                saved.append((page_num, output_filename))
+        
+        pdf_doc.close()
+        error = None
+        
+    except Exception as e:
+        error = str(e)
+    
+    # Let the encoders drain the queue before reporting back
+    for _ in encoders:
+        png_queue.put(None)
+    for encoder in encoders:
+        encoder.join()
+    
+    if encoder_errors:
+        error = error or encoder_errors[0]
+    # Encoder threads finish out of order; report pages in page order
+    log_lines = [f"Saved: {filename}" for _, filename in sorted(saved)]
+    return len(saved), log_lines, error
+
+
+def split_pages(start_idx, end_idx, chunks):
+    """Split a page range into at most `chunks` contiguous ranges."""
+    page_total = end_idx - start_idx
+    if page_total <= 0:
+        return []
+    chunks = max(1, min(chunks, page_total))
+    step = -(-page_total // chunks)
+    return [range(i, min(i + step, end_idx)) for i in range(start_idx, end_idx, step)]
+
+
 def process_files(file_paths, **kwargs):
     '''
     Main processing logic.
@@ -65,6 +184,7 @@ def process_files(file_paths, **kwargs):
     # 2. Get parameters
     image_format = kwargs.get("image_format", "PNG").upper()
     dpi = kwargs.get("dpi", 300)
+    jpeg_quality = kwargs.get("jpeg_quality", 85)
     start_page = kwargs.get("start_page", 1)
     end_page = kwargs.get("end_page", 0)
     prefix = kwargs.get("prefix", "")
@@ -88,52 +208,55 @@ def process_files(file_paths, **kwargs):
     # 3. Process files
     total_pages = 0
     total_files = 0
+    workers = os.cpu_count() or 1
     
-    for file_path in file_paths:
-        if not os.path.exists(file_path):
-            print(f"Skipping - file not found: {file_path}")
-            continue
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Queue every page range of every PDF up front so all cores stay busy
+        jobs = []
+        for file_path in file_paths:
+            if not os.path.exists(file_path):
+                jobs.append((file_path, None, f"Skipping - file not found: {file_path}"))
+                continue
             
-        try:
-            # Open PDF
-            pdf_doc = fitz.open(file_path)
-            pdf_name = os.path.splitext(os.path.basename(file_path))[0]
+            try:
+                with fitz.open(file_path) as pdf_doc:
+                    page_count = pdf_doc.page_count
+            except Exception as e:
+                jobs.append((file_path, None, f"Error processing {file_path}: {str(e)}"))
+                continue
             
             # Determine page range
-            page_count = pdf_doc.page_count
             start_idx = max(0, start_page - 1)  # Convert to 0-indexed
             end_idx = page_count if end_page == 0 else min(end_page, page_count)
             
             if start_idx >= page_count:
-                print(f"Warning: Start page {start_page} exceeds page count for {file_path}")
-                pdf_doc.close()
+                jobs.append((file_path, None, f"Warning: Start page {start_page} exceeds page count for {file_path}"))
                 continue
             
-            # Convert each page
-            for page_num in range(start_idx, end_idx):
-                page = pdf_doc[page_num]
-                
-                # Create output filename
-                page_num_display = page_num + 1
-                if prefix:
-                    output_filename = f"{prefix}_{pdf_name}_page_{page_num_display}.{output_ext}"
-                else:
-                    output_filename = f"{pdf_name}_page_{page_num_display}.{output_ext}"
-                
-                output_path = os.path.join(output_folder_path, output_filename)
-                
-                # Render page to image
-                pix = page.get_pixmap(matrix=fitz.Matrix(dpi/72, dpi/72))
-                pix.save(output_path)
-                
-                total_pages += 1
-                print(f"Saved: {output_filename}")
+            futures = [
+                executor.submit(convert_pages, file_path, page_numbers, output_folder_path, output_ext, dpi, jpeg_quality, prefix)
+                for page_numbers in split_pages(start_idx, end_idx, workers)
+            ]
+            jobs.append((file_path, futures, None))
+        
+        for file_path, futures, message in jobs:
+            if futures is None:
+                print(message)
+                continue
             
-            pdf_doc.close()
-            total_files += 1
+            errors = []
+            for future in futures:
+                pages_saved, log_lines, error = future.result()
+                for line in log_lines:
+                    print(line)
+                total_pages += pages_saved
+                if error:
+                    errors.append(error)
             
-        except Exception as e:
-            print(f"Error processing {file_path}: {str(e)}")
+            if errors:
+                print(f"Error processing {file_path}: {errors[0]}")
+            else:
+                total_files += 1
     
     print(f"\nProcessing complete!")
     print(f"Files processed: {total_files}")
@@ -1,9 +1,13 @@
 import os
 import datetime
 import argparse
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from PIL import Image
-from rembg import remove
+import onnxruntime as ort
+from rembg import new_session, remove
+
+from image_files import get_image_files
 
 # --- Core Components for UI ---
 
@@ -28,31 +32,60 @@ PARAMETERS = [
 
 # --- Script Logic ---
 
-def get_image_files(paths):
+# Each session.run already spreads over all cores with ONNX Runtime's intra-op pool,
+# so two images in flight are enough to hide pre/post-processing. More workers
+# oversubscribe the CPU and hold one set of u2net activations each.
+INFERENCE_WORKERS = 2
+
+
+def get_execution_providers():
     """
-    Recursively finds image files if a folder is passed, 
-    or returns the path if it's a file.
+    Pick the fastest available ONNX Runtime providers (GPU / Apple Neural Engine),
+    always keeping CPU as the last fallback.
     """
-    valid_extensions = {'.png', '.jpg', '.jpeg', '.webp', '.bmp', '.tiff'}
-    images = []
-
-    for path_str in paths:
-        path = Path(path_str)
-        if path.is_file():
-            if path.suffix.lower() in valid_extensions:
-                images.append(path)
-        elif path.is_dir():
-            for root, _, files in os.walk(path):
-                for file in files:
-                    file_path = Path(root) / file
-                    if file_path.suffix.lower() in valid_extensions:
-                        images.append(file_path)
-    return images
+    preferred = ["CUDAExecutionProvider", "CoreMLExecutionProvider", "DmlExecutionProvider"]
+    available = ort.get_available_providers()
+    return [p for p in preferred if p in available] + ["CPUExecutionProvider"]
 
 def str_to_bool(v):
     """Helper to convert string parameters to boolean."""
     return str(v).lower() in ("yes", "true", "t", "1")
 
+def remove_background(img_path, output_folder_path, session, use_alpha, use_post):
+    """
+    Remove the background of a single image. Runs in a worker thread.
+
+    Returns:
+        Tuple of (success, error_message)
+    """
+    try:
+        # Open the image
+        with open(img_path, 'rb') as i:
+            input_data = i.read()
+            
+        # Process with rembg
+        # We treat the input as binary data and receive binary data back
+        output_data = remove(
+            input_data, 
+            session=session,
+            alpha_matting=use_alpha,
+            post_process_mask=use_post
+        )
+
+        # Determine output filename (Ensure it is PNG for transparency)
+        name_without_ext = img_path.stem
+        output_filename = f"{name_without_ext}_nobg.png"
+        output_path = os.path.join(output_folder_path, output_filename)
+
+        # Save the file
+        with open(output_path, 'wb') as o:
+            o.write(output_data)
+        
+        return True, None
+
+    except Exception as e:
+        return False, str(e)
+
 def process_files(file_paths, alpha_matting, post_process_mask):
     """
     Main processing logic.
@@ -80,36 +113,26 @@ def process_files(file_paths, alpha_matting, post_process_mask):
 
     success_count = 0
 
-    for img_path in target_images:
-        try:
-            filename = img_path.name
-            print(f"-> Processing: {filename}")
-            
-            # Open the image
-            with open(img_path, 'rb') as i:
-                input_data = i.read()
-                
-            # Process with rembg
-            # We treat the input as binary data and receive binary data back
-            output_data = remove(
-                input_data, 
-                alpha_matting=use_alpha,
-                post_process_mask=use_post
-            )
-
-            # Determine output filename (Ensure it is PNG for transparency)
-            name_without_ext = img_path.stem
-            output_filename = f"{name_without_ext}_nobg.png"
-            output_path = os.path.join(output_folder_path, output_filename)
-
-            # Save the file
-            with open(output_path, 'wb') as o:
-                o.write(output_data)
-            
-            success_count += 1
-
-        except Exception as e:
-            print(f"!! Error processing {img_path.name}: {e}")
+    # Load the U^2-Net model once and share it across all images
+    providers = get_execution_providers()
+    print(f"Execution providers: {', '.join(providers)}")
+    session = new_session("u2net", providers=providers)
+
+    # Threads rather than processes: ONNX Runtime inference releases the GIL.
+    worker = partial(
+        remove_background,
+        output_folder_path=output_folder_path,
+        session=session,
+        use_alpha=use_alpha,
+        use_post=use_post,
+    )
+    with ThreadPoolExecutor(max_workers=INFERENCE_WORKERS) as executor:
+        for img_path, (ok, error) in zip(target_images, executor.map(worker, target_images)):
+            print(f"-> Processing: {img_path.name}")
+            if ok:
+                success_count += 1
+            else:
+                print(f"!! Error processing {img_path.name}: {error}")
 
     print("-" * 30)
     print(f"Processing complete. {success_count}/{len(target_images)} images saved.")
@@ -2,24 +2,93 @@ import glob
 import os
 import sys
 import datetime
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 import numpy as np
-from PIL import Image, ImageFilter, ImageEnhance
+from PIL import Image, ImageFilter
+
+try:
+    import numba
+except ImportError:  # Optional: falls back to the vectorized NumPy path
+    numba = None
+
+# ITU-R 601 luma weights, the same ones ImageEnhance.Color uses for its gray image
+LUMA_WEIGHTS = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+if numba is not None:
+    @numba.njit(parallel=True, cache=True, fastmath=True)
+    def _vibrance_numba(rgb, vibrance_boost, saturation_boost, out):
+        """Single-pass kernel: reads each pixel once and writes uint8 directly, no float temporaries."""
+        for i in numba.prange(rgb.shape[0]):
+            r = np.float32(rgb[i, 0])
+            g = np.float32(rgb[i, 1])
+            b = np.float32(rgb[i, 2])
+            mx = max(r, g, b)
+            mn = min(r, g, b)
+            gray = np.float32(0.299) * r + np.float32(0.587) * g + np.float32(0.114) * b
+            s = (mx - mn) / mx if mx > 0 else np.float32(0.0)
+            factor = 1 + saturation_boost + vibrance_boost * (1 - s)
+            for c, value in enumerate((r, g, b)):
+                v = gray + (value - gray) * factor
+                out[i, c] = np.uint8(min(max(v, np.float32(0.0)), np.float32(255.0)))
 
 def apply_vibrance_saturation_boost(image, vibrance_boost=0.10, saturation_boost=0.10):
-    enhancer = ImageEnhance.Color(image)
-    saturated_image = enhancer.enhance(1.0 + saturation_boost)
-    img_hsv = saturated_image.convert("HSV")
-    img_array = np.array(img_hsv)
-    h, s, v = img_array[:, :, 0], img_array[:, :, 1], img_array[:, :, 2]
-    s_norm = s / 255.0
-    vibrance_adjustment = vibrance_boost * (1 - s_norm)
-    s_adjusted = s_norm + vibrance_adjustment
-    s_adjusted = np.clip(s_adjusted, 0, 1)
-    s_final = (s_adjusted * 255).astype(np.uint8)
-    img_array[:, :, 1] = s_final
-    vibrance_image_hsv = Image.fromarray(img_array, "HSV")
-    final_image = vibrance_image_hsv.convert("RGB")
-    return final_image
+    # Push each pixel away from its luma in one pass on the RGB array instead of
+    # ImageEnhance.Color plus an RGB -> HSV -> RGB round-trip. Vibrance adds more
+    # to pixels that are still unsaturated (HSV s = (max - min) / max).
+    arr = np.asarray(image, dtype=np.uint8)
+    if numba is not None:
+        out = np.empty_like(arr)
+        _vibrance_numba(
+            np.ascontiguousarray(arr).reshape(-1, 3),
+            np.float32(vibrance_boost),
+            np.float32(saturation_boost),
+            out.reshape(-1, 3),
+        )
+        return Image.fromarray(out, "RGB")
+
+    # One H x W x 3 float32 scratch buffer, updated in place; everything else is H x W
+    scratch = arr.astype(np.float32)
+    gray = np.einsum('hwc,c->hw', scratch, LUMA_WEIGHTS)[..., None]
+    mx = arr.max(axis=2).astype(np.float32)
+    s = arr.min(axis=2).astype(np.float32)
+    np.subtract(mx, s, out=s)
+    np.divide(s, mx, out=s, where=mx > 0)
+    factor = s
+    np.multiply(factor, -vibrance_boost, out=factor)
+    np.add(factor, 1 + saturation_boost + vibrance_boost, out=factor)
+
+    np.subtract(scratch, gray, out=scratch)
+    np.multiply(scratch, factor[..., None], out=scratch)
+    np.add(scratch, gray, out=scratch)
+    np.clip(scratch, 0, 255, out=scratch)
+    return Image.fromarray(scratch.astype(np.uint8), "RGB")
+
+def _init_worker(numba_threads):
+    """Size each worker's numba pool so workers x numba threads matches the core count."""
+    if numba is not None:
+        numba.set_num_threads(numba_threads)
+
+def _process_one(input_path, vibrance_boost, saturation_boost, output_folder, timestamp):
+    """
+    Enhance a single image. Runs in a worker process.
+
+    Returns:
+        Tuple of (success, message) so the parent does all the printing
+    """
+    try:
+        original = Image.open(input_path).convert("RGB")
+        filename = os.path.basename(input_path)
+        name, ext = os.path.splitext(filename)
+        
+        output_path = os.path.join(output_folder, f"{name}_{timestamp}_enhanced{ext}")
+        result_image = apply_vibrance_saturation_boost(original, vibrance_boost, saturation_boost)
+
+        result_image.save(output_path, quality=95)
+        return True, f"Enhanced: {input_path} -> {output_path}"
+
+    except Exception as e:
+        return False, f"Error processing {input_path}: {e}"
 
 def process_images(
     image_paths,
@@ -33,20 +102,22 @@ def process_images(
 
     timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
 
-    for input_path in image_paths:
-        try:
-            original = Image.open(input_path).convert("RGB")
-            filename = os.path.basename(input_path)
-            name, ext = os.path.splitext(filename)
-            
-            output_path = os.path.join(output_folder, f"{name}_{timestamp}_enhanced{ext}")
-            result_image = apply_vibrance_saturation_boost(original, vibrance_boost, saturation_boost)
-
-            result_image.save(output_path, quality=95)
-            print(f"Enhanced: {input_path} -> {output_path}")
-
-        except Exception as e:
-            print(f"Error processing {input_path}: {e}")
+    # Images are independent, so spread them over all cores; the vibrance kernel's
+    # own threads get whatever cores the workers leave over
+    cpus = os.cpu_count() or 1
+    max_workers = max(1, min(cpus, len(image_paths)))
+    worker = partial(
+        _process_one,
+        vibrance_boost=vibrance_boost,
+        saturation_boost=saturation_boost,
+        output_folder=output_folder,
+        timestamp=timestamp,
+    )
+    with ProcessPoolExecutor(
+        max_workers=max_workers, initializer=_init_worker, initargs=(max(1, cpus // max_workers),)
+    ) as executor:
+        for ok, message in executor.map(worker, image_paths, chunksize=4):
+            print(message)
 
 DESCRIPTION = "Applies vibrance and saturation boost to images."
 NAME = "Vibrance Saturation Enhancer"
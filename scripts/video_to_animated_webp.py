@@ -1,10 +1,27 @@
 import os
+import sys
 import datetime
 import argparse
+import shutil
+import subprocess
+from functools import lru_cache
 from pathlib import Path
+import numpy as np
 from PIL import Image
 import cv2
 
+try:
+    # Optional: libavcodec bindings, decodes without OpenCV's BGR intermediate
+    import av
+except ImportError:
+    av = None
+
+try:
+    # Optional: libwebp bindings for frame-by-frame encoding, falls back to PIL save_all
+    import webp
+except ImportError:
+    webp = None
+
 NAME = "Video to Animated WebP"
 DESCRIPTION = "Converts video files to animated WebP format with best quality settings"
 INPUT_TYPES = "Video Files (*.mp4 *.avi *.mov *.mkv *.webm *.flv *.wmv)"
@@ -51,6 +68,192 @@ def process_files(file_paths, **kwargs):
     
     print(f"\nProcessing complete. Output: {output_folder_path}")
 
+def find_ffmpeg():
+    """Find ffmpeg executable, checking common Homebrew paths."""
+    common_paths = [
+        '/opt/homebrew/bin/ffmpeg',  # Apple Silicon
+        '/usr/local/bin/ffmpeg',      # Intel Mac
+        '/opt/local/bin/ffmpeg',      # MacPorts
+    ]
+    
+    for path in common_paths:
+        if os.path.exists(path):
+            return path
+    
+    return shutil.which('ffmpeg')
+
+@lru_cache(maxsize=None)
+def pick_hwaccel(ffmpeg_path):
+    """Pick a hardware decoder: VideoToolbox on macOS, CUDA when a device actually opens, else auto."""
+    try:
+        result = subprocess.run([ffmpeg_path, '-hide_banner', '-hwaccels'], capture_output=True, text=True)
+    except OSError:
+        return None
+    available = result.stdout.split()
+    if sys.platform == 'darwin' and 'videotoolbox' in available:
+        return 'videotoolbox'
+    # -hwaccels lists what the build supports, not what the machine has
+    if 'cuda' in available and cuda_device_available(ffmpeg_path):
+        return 'cuda'
+    # auto picks a working accelerator or silently decodes in software
+    return 'auto'
+
+@lru_cache(maxsize=None)
+def cuda_device_available(ffmpeg_path):
+    """Whether ffmpeg can open a CUDA device, checked by running a one-frame null job on it."""
+    try:
+        result = subprocess.run(
+            [ffmpeg_path, '-hide_banner', '-v', 'error', '-init_hw_device', 'cuda',
+             '-f', 'lavfi', '-i', 'nullsrc=s=16x16:d=0.04', '-f', 'null', '-'],
+            capture_output=True, timeout=15
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return result.returncode == 0
+
+@lru_cache(maxsize=None)
+def has_libwebp_anim(ffmpeg_path):
+    """Whether this ffmpeg build ships the libwebp_anim encoder."""
+    try:
+        result = subprocess.run([ffmpeg_path, '-hide_banner', '-encoders'], capture_output=True, text=True)
+    except OSError:
+        return False
+    return 'libwebp_anim' in result.stdout
+
+def encode_with_ffmpeg(ffmpeg_path, input_path, output_path, quality, fps, width, max_width):
+    """
+    Decode, resample, resize and encode in a single ffmpeg process.
+
+    Frames stream straight from the decoder into libwebp_anim, so nothing is
+    buffered on the Python side.
+    """
+    filters = []
+    if fps > 0:
+        filters.append(f"fps={fps}")
+    if max_width > 0 and width > max_width:
+        filters.append(f"scale={max_width}:-2:flags=lanczos")
+    
+    hwaccel = pick_hwaccel(ffmpeg_path)
+    # Hardware decoding can still fail on this file or driver; the retry decodes in software
+    for accel in ([hwaccel, None] if hwaccel else [None]):
+        ffmpeg_cmd = [ffmpeg_path, '-v', 'error']
+        if accel:
+            # Decoded frames are copied back to system memory before the CPU filters
+            ffmpeg_cmd.extend(['-hwaccel', accel])
+        ffmpeg_cmd.extend(['-i', input_path])
+        if filters:
+            ffmpeg_cmd.extend(['-vf', ','.join(filters)])
+        ffmpeg_cmd.extend([
+            '-an',
+            '-c:v', 'libwebp_anim',
+            '-quality', str(quality),
+            '-compression_level', '6',
+            '-preset', 'picture',
+            '-loop', '0',
+            '-y', output_path
+        ])
+        result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
+        if result.returncode == 0:
+            break
+    return result
+
+def iter_frames_ffmpeg(ffmpeg_path, input_path, frame_interval, width, height):
+    """
+    Yield kept frames as PIL images, decoded by an ffmpeg subprocess.
+
+    The mod-N select runs inside ffmpeg, so dropped frames never cross the
+    pipe, and frames arrive as YUV420 (1.5 bytes/pixel instead of 3 for RGB).
+    width and height must be even for I420. If hardware decoding fails before
+    the first frame, the decode is retried in software.
+    """
+    frame_bytes = width * height * 3 // 2
+    hwaccel = pick_hwaccel(ffmpeg_path)
+    yielded = False
+    for accel in ([hwaccel, None] if hwaccel else [None]):
+        ffmpeg_cmd = [
+            ffmpeg_path, '-v', 'error', '-hwaccel', accel or 'none',
+            '-i', input_path,
+            '-vf', f"select='not(mod(n\\,{frame_interval}))',scale={width}:{height}:flags=lanczos",
+            '-vsync', '0',
+            '-f', 'rawvideo', '-pix_fmt', 'yuv420p',
+            'pipe:1'
+        ]
+        proc = subprocess.Popen(ffmpeg_cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, bufsize=1 << 20)
+        try:
+            while True:
+                data = proc.stdout.read(frame_bytes)
+                if len(data) < frame_bytes:
+                    break
+                yuv = np.frombuffer(data, np.uint8).reshape(height * 3 // 2, width)
+                yield Image.fromarray(cv2.cvtColor(yuv, cv2.COLOR_YUV2RGB_I420))
+                yielded = True
+        finally:
+            proc.stdout.close()
+            proc.wait()
+        if yielded or proc.returncode == 0:
+            return
+
+def iter_frames_av(input_path, frame_interval, width, height):
+    """
+    Yield kept frames as PIL images, decoded in-process with PyAV.
+
+    Frames go from the decoder's YUV straight to RGB (and the output size) in
+    one swscale call, with frame-threaded decoding enabled.
+    """
+    with av.open(input_path) as container:
+        stream = container.streams.video[0]
+        stream.thread_type = 'AUTO'
+        for i, frame in enumerate(container.decode(stream)):
+            if i % frame_interval:
+                continue
+            yield frame.to_image(width=width, height=height, interpolation='LANCZOS')
+
+def iter_frames_cv2(input_path, frame_interval, width, height):
+    """Yield kept frames as PIL images, decoded with OpenCV (used when ffmpeg is missing)."""
+    cap = cv2.VideoCapture(input_path)
+    frame_count = 0
+    try:
+        while True:
+            # grab() skips the BGR conversion for frames that are dropped anyway
+            if not cap.grab():
+                break
+            
+            if frame_count % frame_interval == 0:
+                ret, frame = cap.retrieve()
+                if not ret:
+                    break
+                if frame.shape[1] != width:
+                    frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_LANCZOS4)
+                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                yield Image.fromarray(frame_rgb)
+            
+            frame_count += 1
+    finally:
+        cap.release()
+
+def encode_frames_streaming(frames, output_path, width, height, duration, quality):
+    """
+    Feed frames to libwebp's WebPAnimEncoder as they are decoded, so only one
+    frame is alive at a time instead of the whole clip.
+
+    Returns:
+        Number of frames encoded
+    """
+    encoder = webp.WebPAnimEncoder.new(width, height)
+    config = webp.WebPConfig.new(quality=quality, method=6)
+    timestamp_ms = 0
+    frame_count = 0
+    for img in frames:
+        encoder.encode_frame(webp.WebPPicture.from_pil(img), timestamp_ms, config)
+        timestamp_ms += duration
+        frame_count += 1
+    
+    if frame_count:
+        anim_data = encoder.assemble(timestamp_ms)
+        with open(output_path, 'wb') as f:
+            f.write(anim_data.buffer())
+    return frame_count
+
 def convert_video_to_webp(input_path, output_folder_path, quality, fps, max_width):
     cap = cv2.VideoCapture(input_path)
     if not cap.isOpened():
@@ -60,47 +263,58 @@ def convert_video_to_webp(input_path, output_folder_path, quality, fps, max_widt
     orig_fps = cap.get(cv2.CAP_PROP_FPS)
     width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
     height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
     
     output_fps = orig_fps if fps == 0 else fps
     frame_interval = max(1, round(orig_fps / output_fps))
     
-    frames = []
-    frame_count = 0
-    saved_count = 0
+    output_filename = os.path.splitext(os.path.basename(input_path))[0] + ".webp"
+    output_path = os.path.join(output_folder_path, output_filename)
     
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-        
-        if frame_count % frame_interval == 0:
-            if max_width > 0 and width > max_width:
-                ratio = max_width / width
-                new_width = max_width
-                new_height = int(height * ratio)
-                frame = cv2.resize(frame, (new_width, new_height), interpolation=cv2.INTER_LANCZOS4)
-            
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            img = Image.fromarray(frame_rgb)
-            frames.append(img)
-            saved_count += 1
-        
-        frame_count += 1
+    ffmpeg_path = find_ffmpeg()
+    if ffmpeg_path and has_libwebp_anim(ffmpeg_path):
+        print(f"Encoding {output_path} with ffmpeg (libwebp_anim)...")
+        result = encode_with_ffmpeg(ffmpeg_path, input_path, output_path, quality, fps, width, max_width)
+        if result.returncode != 0:
+            print(f"Error: ffmpeg failed on {input_path}: {result.stderr.strip()}")
+            return
+        print(f"Saved: {output_path}")
+        return
     
-    cap.release()
+    # Fallback: decode frames into Python and encode with PIL
+    new_width, new_height = width, height
+    if max_width > 0 and width > max_width:
+        ratio = max_width / width
+        new_width = max_width
+        new_height = int(height * ratio)
+    
+    if ffmpeg_path:
+        # I420 needs even dimensions
+        new_width, new_height = new_width & ~1, new_height & ~1
+        frames = iter_frames_ffmpeg(ffmpeg_path, input_path, frame_interval, new_width, new_height)
+    elif av is not None:
+        frames = iter_frames_av(input_path, frame_interval, new_width, new_height)
+    else:
+        frames = iter_frames_cv2(input_path, frame_interval, new_width, new_height)
+    
+    duration = int(1000 / output_fps)
+    
+    if webp is not None:
+        print(f"Encoding frames to {output_path}...")
+        frame_count = encode_frames_streaming(frames, output_path, new_width, new_height, duration, quality)
+        if not frame_count:
+            print(f"Error: No frames extracted from {input_path}")
+            return
+        print(f"Saved: {output_path} ({frame_count} frames)")
+        return
     
+    frames = list(frames)
     if not frames:
         print(f"Error: No frames extracted from {input_path}")
         return
     
-    output_filename = os.path.splitext(os.path.basename(input_path))[0] + ".webp"
-    output_path = os.path.join(output_folder_path, output_filename)
-    
     print(f"Saving {len(frames)} frames to {output_path}...")
     
-    duration = int(1000 / output_fps)
-    
     frames[0].save(
         output_path,
         save_all=True,
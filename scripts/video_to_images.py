@@ -1,12 +1,33 @@
 #!/usr/bin/env python3
 import argparse
 import os
+import re
 import sys
 import datetime
 import time
 import subprocess
 import shutil
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
+import cv2
+
+try:
+    # Optional: SIMD libjpeg-turbo encoder for the OpenCV path, falls back to cv2.imwrite
+    from turbojpeg import TurboJPEG, TJSAMP_420
+    turbo_jpeg = TurboJPEG()
+except (ImportError, OSError, RuntimeError):
+    turbo_jpeg = None
+
+try:
+    # Optional: reads stream info in-process instead of launching ffprobe
+    import av
+except ImportError:
+    av = None
+
+# ffmpeg's progress output, e.g. "frame=  1234 fps=..."
+FRAME_COUNT_RE = re.compile(r'frame=\s*(\d+)')
 
 def find_ffmpeg():
     """Find ffmpeg executable, checking common Homebrew paths."""
@@ -28,7 +49,177 @@ def find_ffmpeg():
     
     return None
 
-def process_videos(video_paths, interval=0, start_time=0, lossless=False):
+@lru_cache(maxsize=None)
+def pick_hwaccel(ffmpeg_path):
+    """Pick a hardware decoder: VideoToolbox on macOS, CUDA when a device actually opens, else auto."""
+    try:
+        result = subprocess.run([ffmpeg_path, '-hide_banner', '-hwaccels'], capture_output=True, text=True)
+    except OSError:
+        return None
+    available = result.stdout.split()
+    if sys.platform == 'darwin' and 'videotoolbox' in available:
+        return 'videotoolbox'
+    # -hwaccels lists what the build supports, not what the machine has
+    if 'cuda' in available and cuda_device_available(ffmpeg_path):
+        return 'cuda'
+    # auto picks a working accelerator or silently decodes in software
+    return 'auto'
+
+@lru_cache(maxsize=None)
+def cuda_device_available(ffmpeg_path):
+    """Whether ffmpeg can open a CUDA device, checked by running a one-frame null job on it."""
+    try:
+        result = subprocess.run(
+            [ffmpeg_path, '-hide_banner', '-v', 'error', '-init_hw_device', 'cuda',
+             '-f', 'lavfi', '-i', 'nullsrc=s=16x16:d=0.04', '-f', 'null', '-'],
+            capture_output=True, timeout=15
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return result.returncode == 0
+
+def probe_video(ffmpeg_path, video_path):
+    """Return (fps, codec_name) for the first video stream; either may be None.
+
+    PyAV reads them in-process when installed; otherwise this costs one ffprobe
+    launch per video.
+    """
+    if av is not None:
+        try:
+            with av.open(video_path) as container:
+                stream = container.streams.video[0]
+                rate = stream.average_rate or stream.guessed_rate
+                return (float(rate) if rate else None), stream.codec_context.name
+        except (av.FFmpegError, IndexError):
+            return None, None
+
+    ffprobe_path = ffmpeg_path.replace('ffmpeg', 'ffprobe')
+    probe_cmd = [
+        ffprobe_path,
+        '-v', 'error',
+        '-select_streams', 'v:0',
+        '-show_entries', 'stream=codec_name,r_frame_rate',
+        '-of', 'default=noprint_wrappers=1',
+        video_path
+    ]
+    
+    try:
+        result = subprocess.run(probe_cmd, capture_output=True, text=True, check=True)
+    except subprocess.CalledProcessError:
+        return None, None
+    
+    info = dict(line.split('=', 1) for line in result.stdout.splitlines() if '=' in line)
+    fps = None
+    try:
+        fps_str = info.get('r_frame_rate', '')
+        # Parse fraction (e.g., "30000/1001" or "30/1")
+        if '/' in fps_str:
+            num, den = fps_str.split('/')
+            fps = float(num) / float(den)
+        else:
+            fps = float(fps_str)
+    except (ValueError, ZeroDivisionError):
+        pass
+    return fps, info.get('codec_name')
+
+def decoder_args(codec_name):
+    """Input-side decoder options tuned to the source codec."""
+    if codec_name == 'mjpeg':
+        # Intra-only: the SIMD MJPEG decoder scales across cores with no reference frames
+        return ['-c:v', 'mjpeg', '-threads', str(os.cpu_count() or 1)]
+    if codec_name in ('h264', 'hevc'):
+        # Allow the decoder's non-bit-exact speedups
+        return ['-flags2', '+fast']
+    return []
+
+def print_extraction_stats(saved_count, elapsed, lossless, interval, start_time, video_output_folder):
+    """Print the timing summary for one video."""
+    extraction_fps = saved_count / elapsed if elapsed > 0 else 0
+    time_per_frame = elapsed / saved_count if saved_count > 0 else 0
+    
+    print("\n" + "=" * 60)
+    print("EXTRACTION COMPLETE")
+    print("=" * 60)
+    print(f"Total frames extracted:  {saved_count}")
+    print(f"Total time taken:        {elapsed:.4f} seconds")
+    print(f"Time per frame:          {time_per_frame:.4f} seconds")
+    print(f"Processing speed:        {extraction_fps:.2f} FPS")
+    print(f"Output format:           {'PNG (lossless)' if lossless else 'JPEG (quality 1/highest)'}")
+    print(f"Frame interval:          {interval}s (0 = all frames)")
+    if start_time > 0:
+        print(f"Start time:              {start_time}s")
+    print("=" * 60)
+    print(f"\nFrames saved to: '{video_output_folder}'")
+
+def write_frame(output_path, frame, encode_params):
+    """Write one BGR frame; JPEGs go through libjpeg-turbo when available."""
+    if turbo_jpeg is not None and output_path.endswith(".jpg"):
+        data = turbo_jpeg.encode(frame, quality=encode_params[1], jpeg_subsample=TJSAMP_420)
+        with open(output_path, "wb") as f:
+            f.write(data)
+    else:
+        cv2.imwrite(output_path, frame, encode_params)
+
+def extract_frames_cv2(video_path, video_output_folder, video_name, interval, start_time, lossless):
+    """Extract frames with OpenCV. Used when ffmpeg is not installed.
+
+    Skipped frames are only grab()bed, so they are never converted to BGR;
+    retrieve() runs just for the frames that get written.
+
+    Returns:
+        Number of frames saved, or None if the video could not be opened
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        return None
+    
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    if start_time > 0:
+        cap.set(cv2.CAP_PROP_POS_MSEC, start_time * 1000)
+    
+    frame_interval = max(1, int(fps * interval)) if interval > 0 else 1
+    if lossless:
+        file_extension = "png"
+        encode_params = [cv2.IMWRITE_PNG_COMPRESSION, 1]  # Much faster than the default level, still lossless
+    else:
+        file_extension = "jpg"
+        encode_params = [cv2.IMWRITE_JPEG_QUALITY, 100]
+    
+    # Encoding runs on a thread pool (both encoders release the GIL) so decoding is
+    # never blocked by it. retrieve() hands back a fresh array every call, so
+    # frames can be passed to the pool without copying.
+    workers = os.cpu_count() or 1
+    path_prefix = os.path.join(video_output_folder, f"{video_name}_")
+    pending = deque()
+    frame_count = 0
+    saved_count = 0
+    with ThreadPoolExecutor(max_workers=workers) as enc_pool:
+        while True:
+            if frame_count % frame_interval == 0:
+                if not cap.grab():
+                    break
+                ret, frame = cap.retrieve()
+                if not ret:
+                    break
+                # Same 1-based numbering as ffmpeg's image2 muxer
+                output_path = f"{path_prefix}{saved_count + 1:06d}.{file_extension}"
+                pending.append(enc_pool.submit(write_frame, output_path, frame, encode_params))
+                saved_count += 1
+                # Bound the number of decoded frames waiting in memory
+                if len(pending) > workers * 2:
+                    pending.popleft().result()
+            else:
+                if not cap.grab():
+                    break
+            frame_count += 1
+        
+        for future in pending:
+            future.result()
+    
+    cap.release()
+    return saved_count
+
+def process_videos(video_paths, interval=0, start_time=0, lossless=False, keyframes_only=False):
     """Extract frames from videos using ffmpeg for maximum performance.
 
     Args:
@@ -36,21 +227,27 @@ def process_videos(video_paths, interval=0, start_time=0, lossless=False):
         interval: Seconds between frame extractions (0 = all frames)
         start_time: Start extraction from this timestamp (seconds)
         lossless: If True, use PNG format (slower, lossless). If False, use JPEG (faster, high quality).
+        keyframes_only: If True and interval > 0, extract only keyframes instead of exact intervals (ffmpeg only).
     """
     # Find ffmpeg executable
     ffmpeg_path = find_ffmpeg()
+    hwaccel = None
     if not ffmpeg_path:
-        print("Error: ffmpeg is not installed or not in PATH")
-        print("Please install ffmpeg:")
+        print("Warning: ffmpeg is not installed or not in PATH, falling back to OpenCV (slower)")
+        print("For faster extraction, install ffmpeg:")
         print("  macOS: brew install ffmpeg")
         print("  Ubuntu/Debian: sudo apt install ffmpeg")
         print("  Windows: Download from https://ffmpeg.org/download.html")
         print("\nIf you installed via Homebrew, add this to ~/.zshrc:")
         print("  export PATH=\"/opt/homebrew/bin:$PATH\"")
         print("Then run: source ~/.zshrc")
-        sys.exit(1)
-    
-    print(f"Using ffmpeg: {ffmpeg_path}")
+        if keyframes_only:
+            print("Note: keyframes_only needs ffmpeg and is ignored by the OpenCV fallback")
+    else:
+        print(f"Using ffmpeg: {ffmpeg_path}")
+        hwaccel = pick_hwaccel(ffmpeg_path)
+        if hwaccel:
+            print(f"Hardware decoding: {hwaccel}")
 
     home_dir = os.path.expanduser("~")
     script_name_slug = NAME.lower().replace(" ", "_")
@@ -67,38 +264,34 @@ def process_videos(video_paths, interval=0, start_time=0, lossless=False):
         codec_args = ["-q:v", "1"]  # Highest quality JPEG (1-31 scale, 1 is best)
         print("Using JPEG format (fastest, highest quality)")
 
+    # One timestamp for the whole batch
+    timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+
     for video_path in video_paths:
         if not os.path.exists(video_path):
             print(f"Error: Video file not found: {video_path}")
             continue
 
-        timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
         video_name = Path(video_path).stem
         video_output_folder = os.path.join(output_folder, f"{video_name}_{timestamp}")
         os.makedirs(video_output_folder, exist_ok=True)
 
+        if not ffmpeg_path:
+            print(f"\nProcessing: {video_name}")
+            print(f"Extracting frames...")
+            start_time_total = time.time()
+            saved_count = extract_frames_cv2(video_path, video_output_folder, video_name, interval, start_time, lossless)
+            if saved_count is None:
+                print(f"Error: Could not open video file {video_path}")
+                continue
+            print_extraction_stats(saved_count, time.time() - start_time_total, lossless, interval, start_time, video_output_folder)
+            continue
+
         # Get video info first (FPS)
-        ffprobe_path = ffmpeg_path.replace('ffmpeg', 'ffprobe')
-        probe_cmd = [
-            ffprobe_path,
-            '-v', 'error',
-            '-select_streams', 'v:0',
-            '-show_entries', 'stream=r_frame_rate',
-            '-of', 'default=noprint_wrappers=1:nokey=1',
-            video_path
-        ]
-        
-        try:
-            result = subprocess.run(probe_cmd, capture_output=True, text=True, check=True)
-            fps_str = result.stdout.strip()
-            # Parse fraction (e.g., "30000/1001" or "30/1")
-            if '/' in fps_str:
-                num, den = fps_str.split('/')
-                fps = float(num) / float(den)
-            else:
-                fps = float(fps_str)
+        fps, codec_name = probe_video(ffmpeg_path, video_path)
+        if fps:
             print(f"Video FPS: {fps:.2f}")
-        except subprocess.CalledProcessError:
+        else:
             print(f"Warning: Could not determine FPS, assuming 30")
             fps = 30.0
 
@@ -108,38 +301,56 @@ def process_videos(video_paths, interval=0, start_time=0, lossless=False):
         # Start timing
         start_time_total = time.time()
         
-        # Build filter for frame selection
-        if interval == 0:
-            # Extract all frames
-            filter_select = "select='1'"
-        else:
-            # Extract every N frames based on interval
-            # Calculate how many frames to skip
+        # Build filter for frame selection: the fps filter drops frames by
+        # timestamp, so no per-frame select expression has to be evaluated
+        filter_select = None
+        use_keyframes = keyframes_only and interval > 0
+        if use_keyframes:
+            # The decoder skips every non-keyframe, so P/B frames are never decoded;
+            # spacing follows the video's GOP rather than the requested interval
+            filter_select = "select='eq(pict_type\\,I)'"
+        elif interval > 0:
+            # Keep one frame every N source frames
             frame_interval = int(fps * interval)
-            if frame_interval <= 1:
-                filter_select = "select='1'"
-            else:
-                # Select every Nth frame: not(mod(n, N))
-                filter_select = f"select='not(mod(n\\,{frame_interval}))'"
+            if frame_interval > 1:
+                filter_select = f"fps={fps / frame_interval}"
         
         # Build complete ffmpeg command
         ffmpeg_cmd = [ffmpeg_path]
         
-        # Start time (seeking)
+        # Use every core for decoding and for the filter graph
+        cpu_count = str(os.cpu_count() or 1)
+        ffmpeg_cmd.extend(['-threads', '0', '-filter_threads', cpu_count, '-filter_complex_threads', cpu_count])
+        
+        # Start time (seeking): input seeking jumps to the keyframe before the
+        # target and decodes forward from there, so it is fast and frame-accurate
         if start_time > 0:
             ffmpeg_cmd.extend(['-ss', str(start_time)])
         
+        # Hardware decoding; frames are downloaded to system memory for the image encoders
+        if hwaccel:
+            ffmpeg_cmd.extend(['-hwaccel', hwaccel])
+        
+        # Codec-specific decoder settings
+        ffmpeg_cmd.extend(decoder_args(codec_name))
+        if use_keyframes:
+            ffmpeg_cmd.extend(['-skip_frame', 'nokey'])
+        
         # Input file
         ffmpeg_cmd.extend(['-i', video_path])
         
-        # Video filters
-        ffmpeg_cmd.extend(['-vf', filter_select])
+        # Video filters (none at all when every frame is kept)
+        if filter_select:
+            ffmpeg_cmd.extend(['-vf', filter_select])
+        
+        # Video only: don't demux audio, subtitle or data streams
+        ffmpeg_cmd.extend(['-an', '-sn', '-dn'])
         
         # Output format and quality
         ffmpeg_cmd.extend(codec_args)
         
-        # Force frame output (don't skip duplicates)
-        ffmpeg_cmd.extend(['-vsync', '0'])
+        # Force frame output (don't skip duplicates); keyframes keep their own irregular timing
+        ffmpeg_cmd.extend(['-vsync', 'vfr' if use_keyframes else '0'])
         
         # Overwrite output files
         ffmpeg_cmd.extend(['-y'])
@@ -153,35 +364,38 @@ def process_videos(video_paths, interval=0, start_time=0, lossless=False):
         
         try:
             # Run ffmpeg
-            result = subprocess.run(
-                ffmpeg_cmd,
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            
-            # Count extracted frames
-            saved_count = len(list(Path(video_output_folder).glob(f"*.{file_extension}")))
+            try:
+                result = subprocess.run(
+                    ffmpeg_cmd,
+                    capture_output=True,
+                    text=True,
+                    check=True
+                )
+            except subprocess.CalledProcessError:
+                if not hwaccel:
+                    raise
+                # Hardware decoding can still fail on this file or driver; retry in software
+                print(f"Hardware decoding failed, retrying with software decoding...")
+                hw_index = ffmpeg_cmd.index('-hwaccel')
+                ffmpeg_cmd = ffmpeg_cmd[:hw_index] + ffmpeg_cmd[hw_index + 2:]
+                result = subprocess.run(
+                    ffmpeg_cmd,
+                    capture_output=True,
+                    text=True,
+                    check=True
+                )
             
-            # Calculate timing stats
-            elapsed = time.time() - start_time_total
-            extraction_fps = saved_count / elapsed if elapsed > 0 else 0
-            time_per_frame = elapsed / saved_count if saved_count > 0 else 0
+            # Count extracted frames from ffmpeg's final "frame=" progress line
+            # instead of rescanning the output folder
+            frame_counts = FRAME_COUNT_RE.findall(result.stderr)
+            if frame_counts:
+                saved_count = int(frame_counts[-1])
+            else:
+                saved_count = len(list(Path(video_output_folder).glob(f"*.{file_extension}")))
             
             # Output stats
-            print("\n" + "=" * 60)
-            print("EXTRACTION COMPLETE")
-            print("=" * 60)
-            print(f"Total frames extracted:  {saved_count}")
-            print(f"Total time taken:        {elapsed:.4f} seconds")
-            print(f"Time per frame:          {time_per_frame:.4f} seconds")
-            print(f"Processing speed:        {extraction_fps:.2f} FPS")
-            print(f"Output format:           {'PNG (lossless)' if lossless else 'JPEG (quality 1/highest)'}")
-            print(f"Frame interval:          {interval}s (0 = all frames)")
-            if start_time > 0:
-                print(f"Start time:              {start_time}s")
-            print("=" * 60)
-            print(f"\nFrames saved to: '{video_output_folder}'")
+            elapsed = time.time() - start_time_total
+            print_extraction_stats(saved_count, elapsed, lossless, interval, start_time, video_output_folder)
             
         except subprocess.CalledProcessError as e:
             print(f"\nError running ffmpeg:")
@@ -197,6 +411,7 @@ PARAMETERS = [
     {"name": "interval", "type": "float", "default": 0, "description": "The interval in seconds between frame extractions. Set to 0 to extract all frames."},
     {"name": "start_time", "type": "float", "default": 0, "description": "The timestamp (in seconds) from where to start extracting frames. Default is 0 (start of video)."},
     {"name": "lossless", "type": "bool", "default": False, "label": "Enable lossless (Slow)", "description": "Use PNG format for lossless quality. Slower than JPEG. Default: False (JPEG, highest quality & fast)."},
+    {"name": "keyframes_only", "type": "bool", "default": False, "label": "Keyframes only (Fast)", "description": "With an interval set, extract only keyframes. Much faster on long videos, but frame spacing follows the video's keyframes instead of the exact interval. Requires ffmpeg."},
 ]
 
 def main():
@@ -204,12 +419,20 @@ def main():
     parser.add_argument("video_paths", nargs="+", help="Paths to the videos to process.")
 
     for param in PARAMETERS:
-        parser.add_argument(
-            f'--{param["name"]}',
-            type=eval(param["type"]),
-            default=param["default"],
-            help=f'{param.get("description", "")} Default: {param["default"]}'
-        )
+        if param["type"] == "bool":
+            # The app passes bool parameters as a bare flag, only when enabled
+            parser.add_argument(
+                f'--{param["name"]}',
+                action="store_true",
+                help=param.get("description", "")
+            )
+        else:
+            parser.add_argument(
+                f'--{param["name"]}',
+                type=eval(param["type"]),
+                default=param["default"],
+                help=f'{param.get("description", "")} Default: {param["default"]}'
+            )
 
     args = parser.parse_args()
 
@@ -217,7 +440,8 @@ def main():
         args.video_paths,
         interval=args.interval,
         start_time=args.start_time,
-        lossless=args.lossless
+        lossless=args.lossless,
+        keyframes_only=args.keyframes_only
     )
 
 if __name__ == "__main__":
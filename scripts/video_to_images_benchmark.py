@@ -9,10 +9,32 @@ from pathlib import Path
 import cv2
 import threading
 import queue
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+
+try:
+    # Optional: libvips PNG encoder with its own worker threads, falls back to cv2.imwrite
+    os.environ.setdefault("VIPS_CONCURRENCY", str(os.cpu_count() or 1))
+    import pyvips
+except (ImportError, OSError):
+    pyvips = None
+
+try:
+    # Optional: enables the keyframe-only PyAV method
+    import av
+except ImportError:
+    av = None
+
+try:
+    # Optional: libjpeg-turbo encoder with native BGR input, falls back to cv2.imwrite
+    import simplejpeg
+except ImportError:
+    simplejpeg = None
 
 # Constants
 TEST_FRAMES = 20  # Number of frames to extract for each test
+QUEUE_SIZE = 10  # Frames waiting for the writer thread in the threaded methods
 
 NAME = "Video to Images Benchmark"
 DESCRIPTION = "Benchmarks different approaches for video frame extraction. Tests multiple methods with 20 frames each and reports timing results."
@@ -76,6 +98,103 @@ class BenchmarkResults:
         print(f"Report saved to: {report_path}\n")
 
 
+def _configure_capture(cap):
+    """Keep at most one decoded frame buffered inside the capture (ignored by backends without a queue)."""
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+
+def _open_and_seek(video_path, start_time):
+    """Open the video and seek to start_time (seconds); returns None if it can't be opened."""
+    # Hardware decoding (VAAPI/NVDEC/D3D11/VideoToolbox) can only be requested when
+    # opening; OpenCV builds without it fall back to software decoding
+    cap = cv2.VideoCapture(
+        video_path, cv2.CAP_FFMPEG,
+        [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+    )
+    if not cap.isOpened():
+        cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        return None
+    _configure_capture(cap)
+
+    if start_time > 0:
+        # Seek by frame index: the FFmpeg backend jumps to the preceding keyframe
+        # and decodes forward from there. Fall back to milliseconds without an fps.
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        if fps > 0:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, int(start_time * fps))
+        else:
+            cap.set(cv2.CAP_PROP_POS_MSEC, start_time * 1000)
+
+    return cap
+
+
+def alloc_frame_buffers(cap, count):
+    """
+    Pre-allocate `count` BGR frame buffers sized from the capture, as one block.
+
+    cap.retrieve(buffer) decodes in place when the size matches, so read loops
+    reuse these instead of allocating a fresh multi-MB array per frame.
+    """
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    return np.empty((count, height, width, 3), np.uint8)
+
+
+def write_jpeg(output_path, frame, quality):
+    """Encode a BGR frame as JPEG, via simplejpeg when installed."""
+    if simplejpeg is not None:
+        data = simplejpeg.encode_jpeg(frame, quality=quality, colorspace='BGR', fastdct=True)
+        with open(output_path, "wb") as f:
+            f.write(data)
+    else:
+        cv2.imwrite(output_path, frame, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+
+
+def write_png(output_path, frame, compression=None):
+    """Encode a BGR frame as PNG, via pyvips when installed (None = encoder default level)."""
+    if pyvips is not None:
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)  # libvips expects RGB band order
+        height, width, bands = rgb.shape
+        image = pyvips.Image.new_from_memory(rgb.data, width, height, bands, 'uchar')
+        options = {"strip": True, "effort": 1}
+        if compression is not None:
+            options["compression"] = compression
+        image.pngsave(output_path, **options)
+    elif compression is not None:
+        cv2.imwrite(output_path, frame, [int(cv2.IMWRITE_PNG_COMPRESSION), compression])
+    else:
+        cv2.imwrite(output_path, frame)
+
+
+def write_bytes(output_path, data):
+    """Write an encoded buffer with raw open/write/close syscalls, skipping Python's buffered io."""
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+    fd = os.open(output_path, flags, 0o644)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+
+
+def get_nvjpeg_encoder():
+    """
+    Return (torch, encode_jpeg) when torchvision can encode JPEGs on a CUDA GPU
+    (nvJPEG), else (None, None).
+
+    torch is imported here rather than at module level: it is heavy, and the
+    worker processes of method 10 re-import this module.
+    """
+    try:
+        import torch
+        from torchvision.io import encode_jpeg
+    except ImportError:
+        return None, None
+    if not torch.cuda.is_available():
+        return None, None
+    return torch, encode_jpeg
+
+
 def setup_output_folder(base_name):
     """Create output folder for benchmark."""
     home_dir = os.path.expanduser("~")
@@ -92,26 +211,27 @@ def method_1_original_png(video_path, start_time=0, frame_interval=1):
     """Original approach - PNG with default compression."""
     output_folder = setup_output_folder("1_original_png")
 
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
+    cap = _open_and_seek(video_path, start_time)
+    if cap is None:
         return 0, output_folder
 
-    if start_time > 0:
-        cap.set(cv2.CAP_PROP_POS_MSEC, start_time * 1000)
-
     start_time_total = time.time()
     frame_count = 0
     saved_count = 0
 
+    # Decode into one pre-allocated buffer, reused for every frame
+    frame = alloc_frame_buffers(cap, 1)[0]
     while saved_count < TEST_FRAMES:
-        ret, frame = cap.read()
-        if not ret:
+        if not cap.grab():
             break
-
+        # Skipped frames are only grabbed: retrieve() does the BGR conversion and copy
         if frame_count == 0 or frame_count % frame_interval == 0:
+            ret, frame = cap.retrieve(frame)
+            if not ret:
+                break
             video_name = Path(video_path).stem
             output_path = os.path.join(output_folder, f"{video_name}_{saved_count:06d}.png")
-            cv2.imwrite(output_path, frame)
+            write_png(output_path, frame)
             saved_count += 1
 
         frame_count += 1
@@ -129,26 +249,27 @@ def method_2_png_compression_1(video_path, start_time=0, frame_interval=1):
     """PNG with lowest compression (level 1)."""
     output_folder = setup_output_folder("2_png_compression_1")
 
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
+    cap = _open_and_seek(video_path, start_time)
+    if cap is None:
         return 0, output_folder
 
-    if start_time > 0:
-        cap.set(cv2.CAP_PROP_POS_MSEC, start_time * 1000)
-
     start_time_total = time.time()
     frame_count = 0
     saved_count = 0
 
+    # Decode into one pre-allocated buffer, reused for every frame
+    frame = alloc_frame_buffers(cap, 1)[0]
     while saved_count < TEST_FRAMES:
-        ret, frame = cap.read()
-        if not ret:
+        if not cap.grab():
             break
-
+        # Skipped frames are only grabbed: retrieve() does the BGR conversion and copy
         if frame_count == 0 or frame_count % frame_interval == 0:
+            ret, frame = cap.retrieve(frame)
+            if not ret:
+                break
             video_name = Path(video_path).stem
             output_path = os.path.join(output_folder, f"{video_name}_{saved_count:06d}.png")
-            cv2.imwrite(output_path, frame, [int(cv2.IMWRITE_PNG_COMPRESSION), 1])
+            write_png(output_path, frame, 1)
             saved_count += 1
 
         frame_count += 1
@@ -166,26 +287,27 @@ def method_3_png_compression_9(video_path, start_time=0, frame_interval=1):
     """PNG with highest compression (level 9)."""
     output_folder = setup_output_folder("3_png_compression_9")
 
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
+    cap = _open_and_seek(video_path, start_time)
+    if cap is None:
         return 0, output_folder
 
-    if start_time > 0:
-        cap.set(cv2.CAP_PROP_POS_MSEC, start_time * 1000)
-
     start_time_total = time.time()
     frame_count = 0
     saved_count = 0
 
+    # Decode into one pre-allocated buffer, reused for every frame
+    frame = alloc_frame_buffers(cap, 1)[0]
     while saved_count < TEST_FRAMES:
-        ret, frame = cap.read()
-        if not ret:
+        if not cap.grab():
             break
-
+        # Skipped frames are only grabbed: retrieve() does the BGR conversion and copy
         if frame_count == 0 or frame_count % frame_interval == 0:
+            ret, frame = cap.retrieve(frame)
+            if not ret:
+                break
             video_name = Path(video_path).stem
             output_path = os.path.join(output_folder, f"{video_name}_{saved_count:06d}.png")
-            cv2.imwrite(output_path, frame, [int(cv2.IMWRITE_PNG_COMPRESSION), 9])
+            write_png(output_path, frame, 9)
             saved_count += 1
 
         frame_count += 1
@@ -203,23 +325,24 @@ def method_4_jpeg_quality_100(video_path, start_time=0, frame_interval=1):
     """JPEG with maximum quality (100) - lossy but very fast."""
     output_folder = setup_output_folder("4_jpeg_quality_100")
 
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
+    cap = _open_and_seek(video_path, start_time)
+    if cap is None:
         return 0, output_folder
 
-    if start_time > 0:
-        cap.set(cv2.CAP_PROP_POS_MSEC, start_time * 1000)
-
     start_time_total = time.time()
     frame_count = 0
     saved_count = 0
 
+    # Decode into one pre-allocated buffer, reused for every frame
+    frame = alloc_frame_buffers(cap, 1)[0]
     while saved_count < TEST_FRAMES:
-        ret, frame = cap.read()
-        if not ret:
+        if not cap.grab():
             break
-
+        # Skipped frames are only grabbed: retrieve() does the BGR conversion and copy
         if frame_count == 0 or frame_count % frame_interval == 0:
+            ret, frame = cap.retrieve(frame)
+            if not ret:
+                break
             video_name = Path(video_path).stem
             output_path = os.path.join(output_folder, f"{video_name}_{saved_count:06d}.jpg")
             cv2.imwrite(output_path, frame, [int(cv2.IMWRITE_JPEG_QUALITY), 100])
@@ -240,26 +363,27 @@ def method_5_jpeg_quality_95(video_path, start_time=0, frame_interval=1):
     """JPEG with quality 95 - fast with good quality."""
     output_folder = setup_output_folder("5_jpeg_quality_95")
 
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
+    cap = _open_and_seek(video_path, start_time)
+    if cap is None:
         return 0, output_folder
 
-    if start_time > 0:
-        cap.set(cv2.CAP_PROP_POS_MSEC, start_time * 1000)
-
     start_time_total = time.time()
     frame_count = 0
     saved_count = 0
 
+    # Decode into one pre-allocated buffer, reused for every frame
+    frame = alloc_frame_buffers(cap, 1)[0]
     while saved_count < TEST_FRAMES:
-        ret, frame = cap.read()
-        if not ret:
+        if not cap.grab():
             break
-
+        # Skipped frames are only grabbed: retrieve() does the BGR conversion and copy
         if frame_count == 0 or frame_count % frame_interval == 0:
+            ret, frame = cap.retrieve(frame)
+            if not ret:
+                break
             video_name = Path(video_path).stem
             output_path = os.path.join(output_folder, f"{video_name}_{saved_count:06d}.jpg")
-            cv2.imwrite(output_path, frame, [int(cv2.IMWRITE_JPEG_QUALITY), 95])
+            write_jpeg(output_path, frame, 95)
             saved_count += 1
 
         frame_count += 1
@@ -277,23 +401,24 @@ def method_6_tiff_uncompressed(video_path, start_time=0, frame_interval=1):
     """TIFF with no compression - fastest save."""
     output_folder = setup_output_folder("6_tiff_uncompressed")
 
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
+    cap = _open_and_seek(video_path, start_time)
+    if cap is None:
         return 0, output_folder
 
-    if start_time > 0:
-        cap.set(cv2.CAP_PROP_POS_MSEC, start_time * 1000)
-
     start_time_total = time.time()
     frame_count = 0
     saved_count = 0
 
+    # Decode into one pre-allocated buffer, reused for every frame
+    frame = alloc_frame_buffers(cap, 1)[0]
     while saved_count < TEST_FRAMES:
-        ret, frame = cap.read()
-        if not ret:
+        if not cap.grab():
             break
-
+        # Skipped frames are only grabbed: retrieve() does the BGR conversion and copy
         if frame_count == 0 or frame_count % frame_interval == 0:
+            ret, frame = cap.retrieve(frame)
+            if not ret:
+                break
             video_name = Path(video_path).stem
             output_path = os.path.join(output_folder, f"{video_name}_{saved_count:06d}.tif")
             cv2.imwrite(output_path, frame)
@@ -307,41 +432,67 @@ def method_6_tiff_uncompressed(video_path, start_time=0, frame_interval=1):
 
 
 # ============================================================================
-# METHOD 7: Threaded I/O (separate read and write threads)
+# METHOD 7: Threaded I/O (read thread -> encoder threads -> write thread)
 # ============================================================================
 
 def method_7_threaded_io(video_path, start_time=0, frame_interval=1):
-    """Use separate threads for reading and writing frames."""
+    """Read on the main thread, PNG-encode on a pool of threads, write on one thread."""
     output_folder = setup_output_folder("7_threaded_io")
 
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
+    cap = _open_and_seek(video_path, start_time)
+    if cap is None:
         return 0, output_folder
 
-    if start_time > 0:
-        cap.set(cv2.CAP_PROP_POS_MSEC, start_time * 1000)
-
     start_time_total = time.time()
 
-    # Queue for frame data
-    frame_queue = queue.Queue(maxsize=10)
+    # cv2.imencode releases the GIL, so encoder threads run on separate cores
+    encode_workers = os.cpu_count() or 1
+
+    # Raw frame slots in, encoded buffers out
+    encode_queue = queue.Queue(maxsize=QUEUE_SIZE)
+    write_queue = queue.Queue(maxsize=QUEUE_SIZE)
+
+    # Ring of pre-allocated frame buffers: queued + being encoded + being decoded.
+    # Encoders finish out of order, so free slots are handed back through a queue.
+    buffers = list(alloc_frame_buffers(cap, QUEUE_SIZE + encode_workers + 1))
+    free_slots = queue.Queue()
+    for slot in range(len(buffers)):
+        free_slots.put(slot)
     write_errors = []
 
+    def encode_worker():
+        """Worker thread: deflate one frame at a time and pass the bytes on."""
+        while True:
+            item = encode_queue.get()
+            if item is None:  # Sentinel value to stop
+                break
+            idx, slot, video_name = item
+            try:
+                ok, buf = cv2.imencode(".png", buffers[slot])
+            except Exception as e:
+                ok = False
+                write_errors.append(e)
+            free_slots.put(slot)
+            if ok:
+                output_path = os.path.join(output_folder, f"{video_name}_{idx:06d}.png")
+                write_queue.put((output_path, buf))
+
     def write_worker():
-        """Worker thread for writing frames."""
+        """Worker thread: only write() the already-encoded buffers."""
         while True:
-            item = frame_queue.get()
+            item = write_queue.get()
             if item is None:  # Sentinel value to stop
                 break
-            idx, frame, video_name = item
-            output_path = os.path.join(output_folder, f"{video_name}_{idx:06d}.png")
+            output_path, buf = item
             try:
-                cv2.imwrite(output_path, frame)
+                write_bytes(output_path, buf)
             except Exception as e:
                 write_errors.append(e)
-            frame_queue.task_done()
 
-    # Start writer thread
+    # Start encoder and writer threads
+    encoder_threads = [threading.Thread(target=encode_worker, daemon=True) for _ in range(encode_workers)]
+    for thread in encoder_threads:
+        thread.start()
     writer_thread = threading.Thread(target=write_worker, daemon=True)
     writer_thread.start()
 
@@ -351,18 +502,27 @@ def method_7_threaded_io(video_path, start_time=0, frame_interval=1):
     video_name = Path(video_path).stem
 
     while saved_count < TEST_FRAMES:
-        ret, frame = cap.read()
-        if not ret:
+        if not cap.grab():
             break
 
         if frame_count == 0 or frame_count % frame_interval == 0:
-            frame_queue.put((saved_count, frame.copy(), video_name))
+            # Wait for a free slot, decode straight into it and hand an encoder its index
+            slot = free_slots.get()
+            ret, buffers[slot] = cap.retrieve(buffers[slot])
+            if not ret:
+                free_slots.put(slot)
+                break
+            encode_queue.put((saved_count, slot, video_name))
             saved_count += 1
 
         frame_count += 1
 
-    # Signal writer to stop and wait
-    frame_queue.put(None)
+    # Drain the encoders first, then the writer
+    for _ in encoder_threads:
+        encode_queue.put(None)
+    for thread in encoder_threads:
+        thread.join()
+    write_queue.put(None)
     writer_thread.join()
 
     cap.release()
@@ -382,25 +542,28 @@ def method_8_threaded_jpeg(video_path, start_time=0, frame_interval=1):
     """Threaded I/O with JPEG format."""
     output_folder = setup_output_folder("8_threaded_jpeg")
 
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
+    cap = _open_and_seek(video_path, start_time)
+    if cap is None:
         return 0, output_folder
 
-    if start_time > 0:
-        cap.set(cv2.CAP_PROP_POS_MSEC, start_time * 1000)
-
     start_time_total = time.time()
 
-    frame_queue = queue.Queue(maxsize=10)
+    frame_queue = queue.Queue(maxsize=QUEUE_SIZE)
+
+    # Ring of pre-allocated frame buffers: queued + being written + being decoded.
+    # A slot is only reused once the writer has released it.
+    buffers = list(alloc_frame_buffers(cap, QUEUE_SIZE + 2))
+    free_slots = threading.Semaphore(len(buffers))
 
     def write_worker():
         while True:
             item = frame_queue.get()
             if item is None:
                 break
-            idx, frame, video_name = item
+            idx, slot, video_name = item
             output_path = os.path.join(output_folder, f"{video_name}_{idx:06d}.jpg")
-            cv2.imwrite(output_path, frame, [int(cv2.IMWRITE_JPEG_QUALITY), 95])
+            write_jpeg(output_path, buffers[slot], 95)
+            free_slots.release()
             frame_queue.task_done()
 
     writer_thread = threading.Thread(target=write_worker, daemon=True)
@@ -411,12 +574,18 @@ def method_8_threaded_jpeg(video_path, start_time=0, frame_interval=1):
     video_name = Path(video_path).stem
 
     while saved_count < TEST_FRAMES:
-        ret, frame = cap.read()
-        if not ret:
+        if not cap.grab():
             break
 
         if frame_count == 0 or frame_count % frame_interval == 0:
-            frame_queue.put((saved_count, frame.copy(), video_name))
+            # Wait for a free slot, decode straight into it and hand the writer its index
+            free_slots.acquire()
+            slot = saved_count % len(buffers)
+            ret, buffers[slot] = cap.retrieve(buffers[slot])
+            if not ret:
+                free_slots.release()
+                break
+            frame_queue.put((saved_count, slot, video_name))
             saved_count += 1
 
         frame_count += 1
@@ -437,87 +606,224 @@ def method_9_batch_writing(video_path, start_time=0, frame_interval=1):
     """Collect all frames first, then write them in batch."""
     output_folder = setup_output_folder("9_batch_writing")
 
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
+    cap = _open_and_seek(video_path, start_time)
+    if cap is None:
         return 0, output_folder
 
-    if start_time > 0:
-        cap.set(cv2.CAP_PROP_POS_MSEC, start_time * 1000)
-
     # Phase 1: Read all frames into memory
     start_read = time.time()
+    # Decode straight into one pre-allocated block instead of copying every frame
+    block = alloc_frame_buffers(cap, TEST_FRAMES)
     frames = []
     frame_count = 0
     video_name = Path(video_path).stem
 
     while len(frames) < TEST_FRAMES:
-        ret, frame = cap.read()
-        if not ret:
+        if not cap.grab():
             break
 
         if frame_count == 0 or frame_count % frame_interval == 0:
-            frames.append(frame.copy())
+            ret, frame = cap.retrieve(block[len(frames)])
+            if not ret:
+                break
+            frames.append(frame)
 
         frame_count += 1
 
     cap.release()
     read_time = time.time() - start_read
 
-    # Phase 2: Write all frames
+    # Phase 2: Encode all frames in memory
+    start_encode = time.time()
+    encoded = [cv2.imencode(".png", frame)[1] for frame in frames]
+    encode_time = time.time() - start_encode
+
+    # Phase 3: Write all buffers with raw open/write/close syscalls,
+    # skipping imwrite's and Python file objects' buffering layers
     start_write = time.time()
-    for i, frame in enumerate(frames):
-        output_path = os.path.join(output_folder, f"{video_name}_{i:06d}.png")
-        cv2.imwrite(output_path, frame)
+    for i, buf in enumerate(encoded):
+        write_bytes(os.path.join(output_folder, f"{video_name}_{i:06d}.png"), buf)
     write_time = time.time() - start_write
 
-    total_time = read_time + write_time
-    print(f"    Read time: {read_time:.4f}s, Write time: {write_time:.4f}s")
+    total_time = read_time + encode_time + write_time
+    print(f"    Read time: {read_time:.4f}s, Encode time: {encode_time:.4f}s, Write time: {write_time:.4f}s")
 
     return total_time, len(frames)
 
 
 # ============================================================================
-# METHOD 10: ThreadPoolExecutor (parallel writes)
+# METHOD 10: ProcessPoolExecutor (parallel writes from shared memory)
 # ============================================================================
 
-def method_10_threadpool(video_path, start_time=0, frame_interval=1):
-    """Use ThreadPoolExecutor for parallel frame writing."""
-    output_folder = setup_output_folder("10_threadpool")
+def _write_shared_frames(shm_name, shape, jobs):
+    """Worker: PNG-encode a batch of (offset, output_path) frames straight out of the shared memory block."""
+    shm = shared_memory.SharedMemory(name=shm_name, track=False)
+    try:
+        for offset, output_path in jobs:
+            frame = np.ndarray(shape, np.uint8, buffer=shm.buf, offset=offset)
+            cv2.imwrite(output_path, frame)
+            del frame  # Release the buffer export before closing
+    finally:
+        shm.close()
 
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
+
+def method_10_process_pool(video_path, start_time=0, frame_interval=1):
+    """Use ProcessPoolExecutor for parallel frame writing; frames reach the workers through shared memory."""
+    output_folder = setup_output_folder("10_process_pool")
+
+    cap = _open_and_seek(video_path, start_time)
+    if cap is None:
         return 0, output_folder
 
-    if start_time > 0:
-        cap.set(cv2.CAP_PROP_POS_MSEC, start_time * 1000)
+    start_time_total = time.time()
+
+    # One shared block holds every frame, so workers get a name and an offset
+    # instead of a pickled multi-MB array. Frames are decoded straight into it.
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    shape = (height, width, 3)
+    frame_bytes = height * width * 3
+    frame_count = 0
+    saved_count = 0
+    video_name = Path(video_path).stem
+
+    shm = shared_memory.SharedMemory(create=True, size=max(TEST_FRAMES * frame_bytes, 1))
+    try:
+        while saved_count < TEST_FRAMES:
+            if not cap.grab():
+                break
+
+            if frame_count == 0 or frame_count % frame_interval == 0:
+                view = np.ndarray(shape, np.uint8, buffer=shm.buf, offset=saved_count * frame_bytes)
+                ret, frame = cap.retrieve(view)
+                in_place = frame is view
+                del view, frame  # Release the buffer exports before closing
+                if not ret:
+                    break
+                if not in_place:
+                    # The decoder ignored the buffer (size mismatch), so the block layout no longer holds
+                    raise RuntimeError(f"Decoded frame does not match the {width}x{height} capture size")
+                saved_count += 1
+
+            frame_count += 1
+
+        cap.release()
+
+        # Hand out frames in chunks (about four per worker) so each task attaches
+        # to the block once and the per-task IPC cost is amortized
+        workers = os.cpu_count() or 1
+        jobs = [
+            (idx * frame_bytes, os.path.join(output_folder, f"{video_name}_{idx:06d}.png"))
+            for idx in range(saved_count)
+        ]
+        chunk = max(1, len(jobs) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_write_shared_frames, shm.name, shape, jobs[i:i + chunk])
+                for i in range(0, len(jobs), chunk)
+            ]
+            for future in futures:
+                future.result()
+    finally:
+        cap.release()
+        shm.close()
+        shm.unlink()
+
+    elapsed = time.time() - start_time_total
+    return elapsed, saved_count
+
+
+# ============================================================================
+# METHOD 11: PyAV keyframes only (decoder skips P/B frames)
+# ============================================================================
+
+def method_11_pyav_keyframes(video_path, start_time=0, frame_interval=1):
+    """
+    Decode only keyframes with PyAV and keep every frame_interval-th one.
+
+    frame_interval counts keyframes here, not frames: the decoder never
+    produces the frames in between, so the spacing between saved images is
+    frame_interval times the stream's keyframe (GOP) spacing.
+    """
+    output_folder = setup_output_folder("11_pyav_keyframes")
+
+    with av.open(video_path) as container:
+        stream = container.streams.video[0]
+        stream.thread_type = "AUTO"
+        # The decoder drops non-keyframes without reconstructing them
+        stream.codec_context.skip_frame = "NONKEY"
+
+        start_time_total = time.time()
+
+        if start_time > 0:
+            # Lands on the keyframe at or before start_time
+            container.seek(int(start_time / stream.time_base), stream=stream)
+
+        saved_count = 0
+        keyframe_count = 0
+        video_name = Path(video_path).stem
+
+        for frame in container.decode(stream):
+            if start_time > 0 and frame.time is not None and frame.time < start_time:
+                continue
+            keyframe_count += 1
+            if (keyframe_count - 1) % frame_interval:
+                continue
+            output_path = os.path.join(output_folder, f"{video_name}_{saved_count:06d}.png")
+            write_png(output_path, frame.to_ndarray(format="bgr24"))
+            saved_count += 1
+            if saved_count >= TEST_FRAMES:
+                break
+
+    elapsed = time.time() - start_time_total
+    return elapsed, saved_count
+
+
+# ============================================================================
+# METHOD 12: nvJPEG (JPEG encoded on an NVIDIA GPU)
+# ============================================================================
+
+def method_12_nvjpeg(video_path, start_time=0, frame_interval=1):
+    """JPEG quality 95, batch-encoded on the GPU with nvJPEG through torchvision."""
+    torch, encode_jpeg = get_nvjpeg_encoder()
+    output_folder = setup_output_folder("12_nvjpeg")
+
+    cap = _open_and_seek(video_path, start_time)
+    if cap is None:
+        return 0, output_folder
 
     start_time_total = time.time()
 
+    block = alloc_frame_buffers(cap, TEST_FRAMES)
     frames = []
     frame_count = 0
     video_name = Path(video_path).stem
 
-    # Read all frames
     while len(frames) < TEST_FRAMES:
-        ret, frame = cap.read()
-        if not ret:
+        if not cap.grab():
             break
 
         if frame_count == 0 or frame_count % frame_interval == 0:
-            frames.append((frame.copy(), video_name, len(frames)))
+            ret, frame = cap.retrieve(block[len(frames)])
+            if not ret:
+                break
+            frames.append(frame)
 
         frame_count += 1
 
     cap.release()
 
-    # Write in parallel
-    def write_frame(data):
-        frame, video_name, idx = data
-        output_path = os.path.join(output_folder, f"{video_name}_{idx:06d}.png")
-        cv2.imwrite(output_path, frame)
-
-    with ThreadPoolExecutor(max_workers=4) as executor:
-        executor.map(write_frame, frames)
+    if frames:
+        # Upload, then BGR -> RGB and HWC -> CHW on the device; the whole batch
+        # goes through nvJPEG in one call and only the compressed bytes come back
+        images = [
+            torch.from_numpy(frame).to("cuda").flip(-1).permute(2, 0, 1).contiguous()
+            for frame in frames
+        ]
+        encoded = encode_jpeg(images, quality=95)
+        for idx, data in enumerate(encoded):
+            output_path = os.path.join(output_folder, f"{video_name}_{idx:06d}.jpg")
+            write_bytes(output_path, data.cpu().numpy())
 
     elapsed = time.time() - start_time_total
     return elapsed, len(frames)
@@ -565,8 +871,16 @@ def run_benchmark(video_paths, start_time=0, interval=0):
         ("7. Threaded I/O with PNG", method_7_threaded_io),
         ("8. Threaded I/O with JPEG", method_8_threaded_jpeg),
         ("9. Batch writing (read then write)", method_9_batch_writing),
-        ("10. ThreadPoolExecutor (parallel writes)", method_10_threadpool),
+        ("10. ProcessPoolExecutor (parallel writes)", method_10_process_pool),
     ]
+    if av is not None:
+        methods.append(("11. PyAV keyframes only", method_11_pyav_keyframes))
+    else:
+        print("Skipping method 11 (PyAV keyframes): install 'av' to enable it\n")
+    if get_nvjpeg_encoder()[0] is not None:
+        methods.append(("12. nvJPEG on GPU (JPEG quality 95)", method_12_nvjpeg))
+    else:
+        print("Skipping method 12 (nvJPEG): needs torchvision with a CUDA GPU\n")
 
     for method_name, method_func in methods:
         print(f"Running: {method_name}...")
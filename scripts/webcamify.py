@@ -2,17 +2,24 @@
 """
 webcamify.py
 Dependencies:
-    pip install pillow numpy
+    pip install pillow numpy opencv-python
 """
 
-from PIL import Image, ImageFilter, ImageDraw, ImageFont, ImageOps, ImageEnhance
+from PIL import Image, ImageDraw, ImageFont
 import numpy as np
+import cv2
 import io
 import sys
 import datetime
 import os
-import random
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+try:
+    import numba
+except ImportError:  # Optional: falls back to the vectorized NumPy paths
+    numba = None
 
 NAME = "Webcamify Image"
 DESCRIPTION = "Simulates the look of a cheap webcam from the early 2000s."
@@ -32,104 +39,169 @@ PARAMETERS = [
     {"name": "timestamp", "label": "Timestamp", "type": "bool", "default": True, "description": "Whether to add a timestamp to the image."},
 ]
 
+# S-curve lookup table for crush_dynamic_range (steep at both ends), built once at import
+_SCURVE_LUT = ((np.sin((np.arange(256) / 255.0 - 0.5) * np.pi) + 1) / 2 * 255).astype(np.uint8)
+
+# Pillow's ImageFilter.SMOOTH kernel, the degenerate image ImageEnhance.Sharpness blends against
+_SMOOTH_KERNEL = np.array([[1, 1, 1], [1, 5, 1], [1, 1, 1]], np.float32) / 13
+
+# Sensor noise state reused across images: one PCG64 generator plus float32/int16
+# grain buffers that are only reallocated when the frame size changes
+_RNG = np.random.default_rng()
+_NOISE_BUF = None
+_NOISE_I16 = None
+
+# Timestamp font, loaded once instead of per image
+try:
+    # Try to find a monospace font, fallback to default
+    _FONT = ImageFont.truetype("arial.ttf", 10)
+except OSError:
+    _FONT = ImageFont.load_default()
+
+
+if numba is not None:
+    @numba.njit(parallel=True, cache=True, fastmath=True)
+    def _noise_kernel(arr, noise, col_noise):
+        """Adds both noise layers and clamps in place, one row per thread."""
+        h, w, c = arr.shape
+        for y in numba.prange(h):
+            for x in range(w):
+                for ch in range(c):
+                    v = np.int32(arr[y, x, ch]) + noise[y, x, ch] + col_noise[0, x, ch]
+                    arr[y, x, ch] = 0 if v < 0 else (255 if v > 255 else v)
 
-def apply_chromatic_aberration(img, offset=2):
-    """Simulates cheap lens splitting colors at edges."""
+    @numba.njit(parallel=True, cache=True, fastmath=True)
+    def _interlace_kernel(arr, mul, shift):
+        """Darkens and shifts the odd rows in place; walks right to left so reads see unshifted pixels."""
+        h, w, c = arr.shape
+        for y in numba.prange(h // 2):
+            row = 2 * y + 1
+            for x in range(w - 1, -1, -1):
+                src = x - shift if x >= shift else x
+                for ch in range(c):
+                    arr[row, x, ch] = (np.int32(arr[row, src, ch]) * mul) >> 8
+
+
+# The effect helpers below work on RGB uint8 arrays; process_image converts to
+# NumPy once after the down-res and keeps the frame there through the save.
+
+def apply_chromatic_aberration(arr, offset=2):
+    """Simulates cheap lens splitting colors at edges. Shifts the channels of `arr` in place."""
     if offset == 0:
-        return img
-    r, g, b = img.split()
-    # Shift R and B in opposite directions
-    r = ImageOps.expand(r, border=(0, 0, offset, 0), fill=0).crop((offset, 0, r.width + offset, r.height))
-    b = ImageOps.expand(b, border=(offset, 0, 0, 0), fill=0).crop((0, 0, b.width, b.height))
-    return Image.merge("RGB", (r, g, b))
-
-def add_sensor_noise(img, intensity=0.1):
+        return arr
+    offset = min(offset, arr.shape[1])
+    # Shift R left and B right, filling the uncovered edge with black
+    arr[:, :-offset, 0] = arr[:, offset:, 0]
+    arr[:, arr.shape[1] - offset:, 0] = 0
+    arr[:, offset:, 2] = arr[:, :-offset, 2]
+    arr[:, :offset, 2] = 0
+    return arr
+
+def add_sensor_noise(arr, intensity=0.1):
     """Adds ugly color noise and 'hot pixel' simulation."""
     if intensity <= 0:
-        return img
-    arr = np.array(img).astype(np.float32)
+        return arr
+    global _NOISE_BUF, _NOISE_I16
     h, w, c = arr.shape
-    
-    # Random Gaussian noise (Grain)
-    noise = np.random.normal(0, intensity * 50, (h, w, c))
-    
+    if _NOISE_BUF is None or _NOISE_BUF.shape != (h, w, c):
+        _NOISE_BUF = np.empty((h, w, c), np.float32)
+        _NOISE_I16 = np.empty((h, w, c), np.int16)
+
+    # Random Gaussian noise (Grain), rounded to whole levels
+    _RNG.standard_normal(dtype=np.float32, out=_NOISE_BUF)
+    _NOISE_BUF *= intensity * 50
+    np.copyto(_NOISE_I16, _NOISE_BUF, casting="unsafe")
+    noise = _NOISE_I16
+
     # "Fixed Pattern" noise (vertical streaks often found in old CCDs)
-    col_noise = np.random.normal(0, intensity * 20, (1, w, c))
-    
-    arr = arr + noise + col_noise
-    return Image.fromarray(np.clip(arr, 0, 255).astype(np.uint8))
+    col_noise = (_RNG.standard_normal((1, w, c), dtype=np.float32) * (intensity * 20)).astype(np.int16)
+
+    if numba is not None:
+        arr = np.ascontiguousarray(arr)
+        _noise_kernel(arr, noise, col_noise)
+        return arr
 
-def apply_interlacing(img, opacity=0.2):
+    # Sum in int16 (half the bytes of float32)
+    arr = arr.astype(np.int16)
+    arr += noise
+    arr += col_noise
+    np.clip(arr, 0, 255, out=arr)
+    return arr.astype(np.uint8)
+
+def apply_interlacing(arr, opacity=0.2):
     """Simulates de-interlacing artifacts (comb effect)."""
     if opacity <= 0:
-        return img
-    arr = np.array(img.convert("RGBA"))
-    # Darken every other line
-    arr[1::2, :, 0:3] = arr[1::2, :, 0:3] * (1 - opacity)
-    # Slight horizontal shift for even lines (comb effect)
+        return arr
+    # Darken every other line and shift it slightly right (comb effect) in one pass,
+    # in 8.8 fixed point so the odd rows never leave integer math
+    mul = int((1 - opacity) * 256)
     shift = 1
-    arr[1::2, shift:, :] = arr[1::2, :-shift, :]
-    return Image.fromarray(arr).convert("RGB")
+    if numba is not None:
+        arr = np.ascontiguousarray(arr)
+        _interlace_kernel(arr, mul, shift)
+        return arr
+    rows = arr[1::2]
+    shifted = rows[:, :-shift].astype(np.uint16)
+    shifted *= mul
+    shifted >>= 8
+    # The leftmost pixels have nothing to shift in; they are only darkened
+    edge = rows[:, :shift].astype(np.uint16)
+    edge *= mul
+    edge >>= 8
+    rows[:, shift:] = shifted
+    rows[:, :shift] = edge
+    return arr
 
-def crush_dynamic_range(img):
+def crush_dynamic_range(arr):
     """Simulates bad auto-exposure (crushed blacks, blown highlights)."""
-    # Apply an S-curve using a lookup table
-    lut = []
-    for i in range(256):
-        # Steep curve at ends
-        val = int((np.sin((i / 255.0 - 0.5) * np.pi) + 1) / 2 * 255)
-        lut.append(val)
-    
-    # If the image is not single-channel, apply LUT to each channel
-    if img.mode != 'L':
-        # Split the channels, apply the LUT, and merge them back
-        channels = [ch.point(lut) for ch in img.split()]
-        return Image.merge(img.mode, channels)
-    else:
-        # For single-channel images, apply the LUT directly
-        return img.point(lut)
+    return cv2.LUT(arr, _SCURVE_LUT)
 
-def ghosting_effect(img, strength=0.3):
+def ghosting_effect(arr, strength=0.3):
     """Simulates slow shutter speed / motion blur lag."""
     if strength <= 0:
-        return img
-    # Create a slightly shifted, transparent copy
-    ghost = img.copy()
-    ghost = ghost.filter(ImageFilter.GaussianBlur(radius=2))
-    # Shift it diagonally
-    offset_x = int(random.uniform(-3, 3))
-    offset_y = int(random.uniform(-1, 3))
-    
-    base = Image.new('RGB', (img.width + abs(offset_x), img.height + abs(offset_y)))
-    base.paste(img, (max(0, offset_x), max(0, offset_y)))
-    
-    final = img.copy().convert("RGBA")
-    ghost = ghost.convert("RGBA")
-    
-    # Blend
-    final = Image.blend(final, ghost, strength).convert("RGB")
-    return final
+        return arr
+    # Blend a blurred copy over the frame
+    ghost = cv2.GaussianBlur(arr, (0, 0), 2)
+    return cv2.addWeighted(arr, 1 - strength, ghost, strength, 0)
 
-def add_timestamp(img):
-    w, h = img.size
-    draw = ImageDraw.Draw(img)
-    
-    # Classic "camcorder" date format
-    text = datetime.datetime.now().strftime("%b %d %Y")
-    time_text = datetime.datetime.now().strftime("%I:%M:%S %p")
-    full_text = f"{time_text}\n{text}".upper()
-    
-    try:
-        # Try to find a monospace font, fallback to default
-        font = ImageFont.truetype("arial.ttf", 10) 
-    except:
-        font = ImageFont.load_default()
+def adjust_contrast(arr, factor):
+    """Same blend as ImageEnhance.Contrast: scale around the mean gray level."""
+    mean = int(cv2.cvtColor(arr, cv2.COLOR_RGB2GRAY).mean() + 0.5)
+    return cv2.addWeighted(arr, factor, arr, 0, mean * (1 - factor))
 
-    # Draw with a slight shadow for readability against noise
+def adjust_saturation(arr, factor):
+    """Same blend as ImageEnhance.Color: mix with the grayscale image."""
+    gray = cv2.cvtColor(cv2.cvtColor(arr, cv2.COLOR_RGB2GRAY), cv2.COLOR_GRAY2RGB)
+    return cv2.addWeighted(arr, factor, gray, 1 - factor, 0)
+
+def sharpen(arr, factor):
+    """Driver-style sharpening: a light unsharp mask, then ImageEnhance.Sharpness."""
+    # UnsharpMask(radius=1, percent=40) without the threshold
+    blurred = cv2.GaussianBlur(arr, (0, 0), 1)
+    arr = cv2.addWeighted(arr, 1.4, blurred, -0.4, 0)
+    smooth = cv2.filter2D(arr, -1, _SMOOTH_KERNEL)
+    return cv2.addWeighted(arr, factor, smooth, 1 - factor, 0)
+
+def add_timestamp(arr):
+    h, w = arr.shape[:2]
+
+    # Classic "camcorder" date format (one clock read so both lines agree)
+    now = datetime.datetime.now()
+    full_text = now.strftime("%I:%M:%S %p\n%b %d %Y").upper()
+
+    # Only the bottom-right corner goes through PIL; the text is drawn there and
+    # written back, instead of round-tripping the whole frame
     x, y = w - 80, h - 30
-    draw.text((x+1, y+1), full_text, fill=(10, 10, 10), font=font) # Shadow
-    draw.text((x, y), full_text, fill=(240, 240, 240), font=font) # White text
-    return img
+    left, top = max(x, 0), max(y, 0)
+    corner = Image.fromarray(arr[top:, left:])
+    draw = ImageDraw.Draw(corner)
+    x, y = x - left, y - top
+
+    # Draw with a slight shadow for readability against noise
+    draw.text((x+1, y+1), full_text, fill=(10, 10, 10), font=_FONT) # Shadow
+    draw.text((x, y), full_text, fill=(240, 240, 240), font=_FONT) # White text
+    arr[top:, left:] = np.asarray(corner)
+    return arr
 
 def process_image(input_path, output_path, params):
     img = Image.open(input_path).convert("RGB")
@@ -157,44 +229,70 @@ def process_image(input_path, output_path, params):
     if native_h % 2 != 0: native_h -= 1
     
     img = img.resize((native_w, native_h), Image.BILINEAR)
+    arr = np.array(img)
 
     # 2. LENS DISTORTION (Chromatic Aberration)
-    img = apply_chromatic_aberration(img, offset=params["chroma_offset"])
+    arr = apply_chromatic_aberration(arr, offset=params["chroma_offset"])
 
     # 3. GHOSTING / LAG
-    img = ghosting_effect(img, strength=params["ghosting_strength"])
+    arr = ghosting_effect(arr, strength=params["ghosting_strength"])
 
     # 4. SENSOR NOISE
-    img = add_sensor_noise(img, intensity=params["noise_level"])
+    arr = add_sensor_noise(arr, intensity=params["noise_level"])
 
     # 5. EXPOSURE / COLOR (Bad dynamic range)
-    enhancer = ImageEnhance.Contrast(img)
-    img = enhancer.enhance(params["contrast"])
-    enhancer = ImageEnhance.Color(img)
-    img = enhancer.enhance(params["saturation"])
-    img = crush_dynamic_range(img)
+    arr = adjust_contrast(arr, params["contrast"])
+    arr = adjust_saturation(arr, params["saturation"])
+    arr = crush_dynamic_range(arr)
 
     # 6. DIGITAL SHARPENING (The "Logitech Driver" effect)
-    img = img.filter(ImageFilter.UnsharpMask(radius=1, percent=40, threshold=3))
-    enhancer = ImageEnhance.Sharpness(img)
-    img = enhancer.enhance(params["sharpness"])
+    arr = sharpen(arr, params["sharpness"])
 
     # 7. INTERLACING
-    img = apply_interlacing(img, opacity=params["interlace_opacity"])
+    arr = apply_interlacing(arr, opacity=params["interlace_opacity"])
 
     # 8. FINAL UPSCALE
-    # Use nearest neighbor to preserve the chunky pixels.
+    # Use nearest neighbor to preserve the chunky pixels. NEAREST_EXACT samples
+    # pixel centers like Pillow's NEAREST, so the output is pixel-identical to it.
     final_w = native_w * params["output_scale"]
     final_h = native_h * params["output_scale"]
-    img = img.resize((final_w, final_h), Image.NEAREST)
+    arr = cv2.resize(arr, (final_w, final_h), interpolation=cv2.INTER_NEAREST_EXACT)
 
     # 9. TIMESTAMP
     if params["timestamp"]:
-        img = add_timestamp(img)
+        arr = add_timestamp(arr)
+
+    # 10. SAVE (with aggressive JPEG compression, no chroma subsampling)
+    encode_params = [
+        cv2.IMWRITE_JPEG_QUALITY, params["jpeg_quality"],
+        cv2.IMWRITE_JPEG_SAMPLING_FACTOR, cv2.IMWRITE_JPEG_SAMPLING_FACTOR_444,
+    ]
+    if not cv2.imwrite(output_path, cv2.cvtColor(arr, cv2.COLOR_RGB2BGR), encode_params):
+        raise IOError(f"Could not write {output_path}")
+
+def _init_worker():
+    """Give each worker process its own noise stream and leave the cores to the pool."""
+    global _RNG
+    # Forked workers would otherwise inherit the parent's generator state and
+    # produce identical grain
+    _RNG = np.random.default_rng()
+    if numba is not None:
+        numba.set_num_threads(1)
 
-    # 10. SAVE (with aggressive JPEG compression)
-    img.save(output_path, "JPEG", quality=params["jpeg_quality"], subsampling=0)
-    print(f"Webcamified image saved to {output_path}")
+def _process_one(image_path, output_folder, timestamp, params):
+    """
+    Webcamify a single image. Runs in a worker process.
+
+    Returns:
+        Tuple of (success, message) so the parent does all the printing
+    """
+    try:
+        filename, _ = os.path.splitext(os.path.basename(image_path))
+        output_path = os.path.join(output_folder, f"{filename}_{timestamp}.jpg")
+        process_image(image_path, output_path, params)
+        return True, f"Webcamified image saved to {output_path}"
+    except Exception as e:
+        return False, f"Error processing {image_path}: {e}"
 
 def process_images(image_paths, **kwargs):
     home_dir = os.path.expanduser("~")
@@ -203,10 +301,19 @@ def process_images(image_paths, **kwargs):
     os.makedirs(output_folder, exist_ok=True)
     timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
 
-    for image_path in image_paths:
-        filename, _ = os.path.splitext(os.path.basename(image_path))
-        output_path = os.path.join(output_folder, f"{filename}_{timestamp}.jpg")
-        process_image(image_path, output_path, kwargs)
+    # Images are independent, so spread them over all cores
+    worker = partial(_process_one, output_folder=output_folder, timestamp=timestamp, params=kwargs)
+    max_workers = min(len(image_paths), os.cpu_count() or 1)
+    failed = 0
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker) as executor:
+        for ok, message in executor.map(worker, image_paths):
+            print(message)
+            if not ok:
+                failed += 1
+
+    if failed:
+        print(f"{failed}/{len(image_paths)} images failed.", file=sys.stderr)
+        sys.exit(1)
 
 def main():
     parser = argparse.ArgumentParser(description=DESCRIPTION)
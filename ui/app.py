@@ -3,6 +3,8 @@ import customtkinter as ctk
 import os
 import sys
 import threading
+from functools import cache
+import tkinter as tk
 from tkinter import filedialog
 import datetime
 
@@ -14,16 +16,102 @@ from config.app_config import WINDOW_SIZE
 from core.script_manager import ScriptManager
 from core.script_executor import ScriptExecutor, open_output_folder
 from core.file_handler import FileHandler
-from config import get_config, get_current_llm
-from core.llm_generator import ScriptGenerator, GenerationError, APIError, ValidationError
 
 from ui.components.sidebar import Sidebar
 from ui.components.console import Console
-from ui.components.generator_panel import GeneratorPanel
-from ui.dialogs.settings_dialog import SettingsDialog
-from ui.dialogs.script_editor_dialog import ScriptEditorDialog
+from ui.components.file_list import FileList
 from core.script_version_manager import ScriptVersionManager
 
+# Script outputs go to ~/Downloads/<script_slug>; resolved once at import
+DOWNLOADS_DIR = os.path.expanduser("~/Downloads")
+
+
+# --- Parameter widgets ---
+# CTkFont needs a Tk root, so the shared fonts are created on first use and then reused.
+# Each builder returns (widget, variable); run_script reads the Tk variables directly
+
+@cache
+def _label_font():
+    return ctk.CTkFont(size=12, weight="bold")
+
+
+@cache
+def _desc_font():
+    return ctk.CTkFont(size=11)
+
+
+def _build_choice(parent, param):
+    var = tk.StringVar(master=parent, value=param["default"])
+    widget = ctk.CTkOptionMenu(
+        parent,
+        values=param["choices"],
+        variable=var,
+        fg_color=COLORS["bg_root"],
+        button_color=COLORS["accent"]
+    )
+    return widget, var
+
+
+def _build_entry(parent, param):
+    var = tk.StringVar(master=parent, value=str(param.get("default", "")))
+    widget = ctk.CTkEntry(
+        parent,
+        textvariable=var,
+        fg_color=COLORS["bg_root"],
+        border_color=COLORS["border"]
+    )
+    return widget, var
+
+
+def _build_switch(parent, param):
+    var = tk.BooleanVar(master=parent, value=bool(param.get("default")))
+    widget = ctk.CTkSwitch(
+        parent,
+        text="Enable",
+        variable=var,
+        onvalue=True,
+        offvalue=False,
+        progress_color=COLORS["success"]
+    )
+    return widget, var
+
+
+def _build_default(parent, param):
+    var = tk.StringVar(master=parent)
+    return ctk.CTkEntry(parent, textvariable=var, fg_color=COLORS["bg_root"]), var
+
+
+# Input widget factory per parameter type; unknown types get a plain entry
+_PARAM_BUILDERS = {
+    "choice": _build_choice,
+    "integer": _build_entry,
+    "int": _build_entry,
+    "float": _build_entry,
+    "string": _build_entry,
+    "boolean": _build_switch,
+    "bool": _build_switch,
+}
+
+
+def _parse_filetypes(input_str):
+    """Turn an INPUT_TYPES string like "Images (*.png *.jpg)" into file dialog filetypes."""
+    filetypes = []
+    if input_str:
+        parts = input_str.split("(")
+        if len(parts) > 1:
+            desc = parts[0].strip()
+            exts = parts[1].replace(")", "")
+            filetypes.append((desc, exts))
+    filetypes.append(("All Files", "*.*"))
+    return filetypes
+
+
+def _set_btn(btn, **kwargs):
+    """Configure a button, skipping the redraw when nothing would change."""
+    if all(btn.cget(key) == value for key, value in kwargs.items()):
+        return
+    btn.configure(**kwargs)
+
 
 class App(ctk.CTk):
     """Main application window."""
@@ -44,12 +132,19 @@ class App(ctk.CTk):
         self.version_manager = ScriptVersionManager()
         self.scripts = self.script_manager.load_scripts()
         self.current_script = None
-        self.parameter_widgets = {}
+        self.parameter_vars = {}  # Tk variable behind each parameter widget, by name
         self.selected_files = []
+        self._selected_set = set()  # Mirrors selected_files for O(1) duplicate checks
+        self._basenames = []  # Display names, kept index-aligned with selected_files
         self.script_buttons = {}
         self.current_process = None
         self.showing_generator = False
         self.generator_widgets = {}
+        self.generator_panel = None
+        # File/folder dialogs are created on first use and reused, so each one
+        # reopens in the directory the user last picked from
+        self._open_dlg = None
+        self._folder_dlg = None
 
         # --- UI Components ---
         self.create_sidebar()
@@ -207,21 +302,16 @@ class App(ctk.CTk):
         )
         self.add_folder_btn.pack(side="left", fill="x", expand=True, padx=(5, 0))
 
-        # File List
-        self.file_list_scroll = ctk.CTkScrollableFrame(
+        # File List (only the visible rows get widgets)
+        self.file_list = FileList(
             self.files_card,
+            on_remove=self.remove_file,
+            placeholder_text="Drag and drop not supported.\nPlease use buttons above.",
             fg_color=COLORS["bg_root"],
             height=150,
             corner_radius=6
         )
-        self.file_list_scroll.pack(fill="both", expand=True, padx=15, pady=(0, 15))
-
-        self.file_list_placeholder = ctk.CTkLabel(
-            self.file_list_scroll,
-            text="Drag and drop not supported.\nPlease use buttons above.",
-            text_color=COLORS["border"]
-        )
-        self.file_list_placeholder.pack(pady=40)
+        self.file_list.pack(fill="both", expand=True, padx=15, pady=(0, 15))
 
         # 3. Console & Execution
         self.bottom_frame = ctk.CTkFrame(self.main_frame, fg_color="transparent")
@@ -299,12 +389,12 @@ class App(ctk.CTk):
 
         self.add_file_btn.configure(state="normal")
         self.clear_files_btn.configure(state="normal")
-        self.run_button.configure(state="normal", text="RUN SCRIPT", fg_color=COLORS["success"])
+        _set_btn(self.run_button, state="normal", text="RUN SCRIPT", fg_color=COLORS["success"])
 
         # Clear Params
         for widget in self.params_scroll.winfo_children():
             widget.destroy()
-        self.parameter_widgets = {}
+        self.parameter_vars = {}
 
         # Build Params
         if not script["parameters"]:
@@ -325,40 +415,16 @@ class App(ctk.CTk):
             lbl = ctk.CTkLabel(
                 param_frame,
                 text=label_text,
-                font=ctk.CTkFont(size=12, weight="bold"),
+                font=_label_font(),
                 anchor="w"
             )
             lbl.pack(fill="x", pady=(0, 2))
 
             # Input Widget
-            if param["type"] == "choice":
-                widget = ctk.CTkOptionMenu(
-                    param_frame,
-                    values=param["choices"],
-                    fg_color=COLORS["bg_root"],
-                    button_color=COLORS["accent"]
-                )
-                widget.set(param["default"])
-            elif param["type"] in ["integer", "int", "float", "string"]:
-                widget = ctk.CTkEntry(
-                    param_frame,
-                    fg_color=COLORS["bg_root"],
-                    border_color=COLORS["border"]
-                )
-                widget.insert(0, str(param.get("default", "")))
-            elif param["type"] in ["boolean", "bool"]:
-                widget = ctk.CTkSwitch(
-                    param_frame,
-                    text="Enable",
-                    progress_color=COLORS["success"]
-                )
-                if param.get("default"):
-                    widget.select()
-            else:
-                widget = ctk.CTkEntry(param_frame, fg_color=COLORS["bg_root"])
-
+            builder = _PARAM_BUILDERS.get(param["type"], _build_default)
+            widget, var = builder(param_frame, param)
             widget.pack(fill="x")
-            self.parameter_widgets[param["name"]] = widget
+            self.parameter_vars[param["name"]] = var
 
             # Description
             if param.get("description"):
@@ -366,129 +432,108 @@ class App(ctk.CTk):
                     param_frame,
                     text=param.get("description"),
                     text_color=COLORS["text_sub"],
-                    font=ctk.CTkFont(size=11),
+                    font=_desc_font(),
                     anchor="w",
                     justify="left",
                     wraplength=380
                 )
                 desc_lbl.pack(fill="x", pady=(4, 2))
 
-        self.selected_files = []
+        # Derived once per script dict and reused when the script is selected again
+        if "_output_dir" not in script:
+            script["_slug"] = script["name"].lower().replace(" ", "_")
+            script["_output_dir"] = os.path.join(DOWNLOADS_DIR, script["_slug"])
+            script["_filetypes"] = _parse_filetypes(script.get("input_types", ""))
+
+        self._set_selected_files([])
         self.update_file_list_ui()
 
     # --- File Handling ---
 
+    def _set_selected_files(self, files):
+        """Replace the selection (selected_files, its set and display names)."""
+        self.selected_files = list(files)
+        self._selected_set = set(self.selected_files)
+        self._basenames = [os.path.basename(f) for f in self.selected_files]
+
+    def _select_file(self, path):
+        """Append a file to the selection unless already selected; returns True if added."""
+        if path in self._selected_set:
+            return False
+        self._selected_set.add(path)
+        self.selected_files.append(path)
+        self._basenames.append(os.path.basename(path))
+        return True
+
     def update_file_list_ui(self):
         """Update the file list display."""
-        for widget in self.file_list_scroll.winfo_children():
-            widget.destroy()
+        self.file_list.set_files(self.selected_files, self._basenames)
 
         if not self.selected_files:
-            self.file_list_placeholder = ctk.CTkLabel(
-                self.file_list_scroll,
-                text="No files selected",
-                text_color=COLORS["border"]
-            )
-            self.file_list_placeholder.pack(pady=40)
-            self.run_button.configure(state="disabled", fg_color=COLORS["border"])
+            _set_btn(self.run_button, state="disabled", fg_color=COLORS["border"])
             return
 
         # Re-enable run button if we have files
-        self.run_button.configure(state="normal", fg_color=COLORS["success"])
-
-        for i, file_path in enumerate(self.selected_files):
-            row = ctk.CTkFrame(self.file_list_scroll, fg_color=COLORS["bg_card"], height=35)
-            row.pack(fill="x", pady=2)
-
-            # Use grid layout with proper column weights
-            row.grid_columnconfigure(1, weight=1)
-
-            # Icon (fixed width)
-            icon = ctk.CTkLabel(row, text="📄", width=30, anchor="center")
-            icon.grid(row=0, column=0, padx=(5, 0))
-
-            # Filename (expands, but truncates if too long)
-            name = os.path.basename(file_path)
-            # Truncate filename if too long (max 40 chars)
-            if len(name) > 40:
-                name = name[:37] + "..."
-            lbl = ctk.CTkLabel(
-                row,
-                text=name,
-                anchor="w",
-                font=ctk.CTkFont(size=12),
-                text_color=COLORS["text_main"]
-            )
-            lbl.grid(row=0, column=1, sticky="ew", padx=5, pady=5)
-
-            # Delete button (fixed width, always visible)
-            del_btn = ctk.CTkButton(
-                row,
-                text="×",
-                width=30,
-                height=25,
-                fg_color="transparent",
-                hover_color=COLORS["danger"],
-                text_color=COLORS["danger"],
-                font=("Arial", 16, "bold"),
-                command=lambda idx=i: self.remove_file(idx)
-            )
-            del_btn.grid(row=0, column=2, padx=(0, 5), pady=5)
+        _set_btn(self.run_button, state="normal", fg_color=COLORS["success"])
 
     def remove_file(self, index):
         """Remove a file from the list."""
         if 0 <= index < len(self.selected_files):
-            del self.selected_files[index]
+            self._selected_set.discard(self.selected_files.pop(index))
+            del self._basenames[index]
             self.update_file_list_ui()
 
     def clear_files(self):
         """Clear all selected files."""
-        self.selected_files = []
+        self._set_selected_files([])
         self.update_file_list_ui()
 
+    def _ask_open(self, multiple):
+        """Show the shared open-file dialog and return the chosen paths as a tuple."""
+        if self._open_dlg is None:
+            self._open_dlg = filedialog.Open(self, initialdir=DOWNLOADS_DIR)
+        # The dialog remembers initialdir from the last pick; only the filter and mode change
+        self._open_dlg.options["filetypes"] = self._get_filetypes()
+        self._open_dlg.options["multiple"] = multiple
+        result = self._open_dlg.show()
+        if isinstance(result, str):
+            return (result,) if result else ()
+        return tuple(result)
+
+    def _ask_folder(self):
+        """Show the shared folder dialog and return the chosen folder ('' if cancelled)."""
+        if self._folder_dlg is None:
+            self._folder_dlg = filedialog.Directory(self, initialdir=DOWNLOADS_DIR)
+        return self._folder_dlg.show()
+
     def add_file(self):
         """Add a single file."""
         if not self.current_script:
             return
-        filetypes = self._get_filetypes()
-        downloads_dir = os.path.expanduser("~/Downloads")
-        file = filedialog.askopenfilename(filetypes=filetypes, initialdir=downloads_dir)
-        if file:
-            self.selected_files = [file]
+        files = self._ask_open(multiple=False)
+        if files:
+            self._set_selected_files(files[:1])
             self.update_file_list_ui()
 
     def add_files(self):
         """Add multiple files."""
         if not self.current_script:
             return
-        filetypes = self._get_filetypes()
-        downloads_dir = os.path.expanduser("~/Downloads")
-        files = filedialog.askopenfilenames(filetypes=filetypes, initialdir=downloads_dir)
+        files = self._ask_open(multiple=True)
         if files:
             for file in files:
-                if file not in self.selected_files:
-                    self.selected_files.append(file)
+                self._select_file(file)
             self.update_file_list_ui()
 
     def _get_filetypes(self):
-        """Get filetypes for file dialog."""
-        filetypes = []
-        input_str = self.current_script.get("input_types", "")
-        if input_str:
-            parts = input_str.split("(")
-            if len(parts) > 1:
-                desc = parts[0].strip()
-                exts = parts[1].replace(")", "")
-                filetypes.append((desc, exts))
-        filetypes.append(("All Files", "*.*"))
-        return filetypes
+        """Get filetypes for file dialog (parsed once per script in load_script_details)."""
+        return self.current_script["_filetypes"]
 
     def add_folder(self):
         """Add all files from a folder."""
         if not self.current_script:
             return
-        downloads_dir = os.path.expanduser("~/Downloads")
-        folder = filedialog.askdirectory(initialdir=downloads_dir)
+        folder = self._ask_folder()
         if not folder:
             return
 
@@ -497,12 +542,31 @@ class App(ctk.CTk):
             self.current_script.get("input_types", "")
         )
 
-        images = file_handler.get_images_from_folder(folder, target_exts)
-        for img in images:
-            if img not in self.selected_files:
-                self.selected_files.append(img)
+        script = self.current_script
+
+        def scan():
+            # Walk the folder off the UI thread; hand results back in batches so
+            # the first files show up before a large folder is fully scanned
+            batch = []
+            for img in file_handler.iter_images_from_folder(folder, target_exts):
+                batch.append(img)
+                if len(batch) == 500:
+                    self.after(0, self._apply_folder_results, script, batch)
+                    batch = []
+            if batch:
+                self.after(0, self._apply_folder_results, script, batch)
+
+        threading.Thread(target=scan, daemon=True).start()
+
+    def _apply_folder_results(self, script, images):
+        """Add a batch of scanned files (runs on the UI thread)."""
+        # The user picked another script while the folder was being scanned
+        if script is not self.current_script:
+            return
 
-        if images:
+        added = sum(self._select_file(img) for img in images)
+
+        if added:
             self.update_file_list_ui()
 
     # --- Script Execution ---
@@ -515,29 +579,17 @@ class App(ctk.CTk):
         script_filename = self.current_script["filename"]
         script_path = os.path.join("scripts", f"{script_filename}.py")
 
-        # Get parameter values
-        params = {}
-        for name, widget in self.parameter_widgets.items():
-            param_def = next(
-                (p for p in self.current_script["parameters"] if p["name"] == name),
-                None
-            )
-            if param_def and param_def["type"] in ["boolean", "bool"]:
-                params[name] = widget.get() == 1
-            else:
-                params[name] = widget.get()
+        # Get parameter values (switch variables are already booleans)
+        params = {name: var.get() for name, var in self.parameter_vars.items()}
 
-        # Build output directory
-        script_name_slug = self.current_script["name"].lower().replace(" ", "_")
-        downloads_dir = os.path.expanduser("~/Downloads")
-        output_dir = os.path.join(downloads_dir, script_name_slug)
+        output_dir = self.current_script["_output_dir"]
 
         # Initialize console
         self.output_console.initialize_script(self.current_script["name"], output_dir)
 
         # Update UI
-        self.run_button.configure(state="disabled", text="PROCESSING...", fg_color=COLORS["accent"])
-        self.stop_button.configure(state="normal")
+        _set_btn(self.run_button, state="disabled", text="PROCESSING...", fg_color=COLORS["accent"])
+        _set_btn(self.stop_button, state="normal")
 
         # Execute
         self.executor.execute(script_path, self.selected_files, params, self.current_script)
@@ -548,51 +600,64 @@ class App(ctk.CTk):
             self.output_console.append_stream("\n> Interrupting script...\n")
             self.executor.stop()
             self.output_console.append_stream("\n> Script interrupted by user.\n")
-            self.stop_button.configure(state="disabled")
-            self.run_button.configure(state="normal", text="RUN SCRIPT", fg_color=COLORS["success"])
+            _set_btn(self.stop_button, state="disabled")
+            _set_btn(self.run_button, state="normal", text="RUN SCRIPT", fg_color=COLORS["success"])
 
     def _process_finished(self, return_code, output_dir):
         """Handle process completion."""
-        self.stop_button.configure(state="disabled")
+        _set_btn(self.stop_button, state="disabled")
 
         if return_code == 0:
             self.output_console.show_success(output_dir)
             if output_dir:
                 if not open_output_folder(output_dir):
                     self.output_console.append_stream("Could not open output folder.\n")
-            self.run_button.configure(state="normal", text="RUN SCRIPT", fg_color=COLORS["success"])
+            _set_btn(self.run_button, state="normal", text="RUN SCRIPT", fg_color=COLORS["success"])
         else:
             self.output_console.show_failure(return_code)
-            self.run_button.configure(state="normal", text="RETRY", fg_color=COLORS["danger"])
+            _set_btn(self.run_button, state="normal", text="RETRY", fg_color=COLORS["danger"])
 
     # --- Generator Methods ---
 
     def show_generator(self):
-        """Show the script generator panel."""
+        """Show the script generator panel in place of the main area."""
+        if self.showing_generator:
+            return
         self.showing_generator = True
-        self.current_script = None
 
         # Unhighlight sidebar
         for name, btn in self.sidebar.script_buttons.items():
             btn.configure(fg_color="transparent", text_color=COLORS["text_sub"])
 
-        # Clear main area
-        for widget in self.main_frame.winfo_children():
-            widget.destroy()
+        # Hide the main area rather than destroying it; it is shown again unchanged on exit
+        self.main_frame.grid_remove()
+
+        # Imported on first use: it pulls in the LLM client stack
+        from ui.components.generator_panel import GeneratorPanel
 
         # Create generator panel
         self.generator_panel = GeneratorPanel(
-            self.main_frame,
+            self,
             self.scripts,
             on_complete=self._on_generator_complete,
             on_cancel=self._exit_generator
         )
-        self.generator_panel.pack(fill="both", expand=True)
+        self.generator_panel.grid(row=0, column=1, sticky="nsew", padx=30, pady=30)
 
     def _on_generator_complete(self, script_filename):
         """Called when script generation completes."""
-        # Reload scripts
-        self.scripts = self.script_manager.refresh()
+        # Reload scripts off the UI thread, then update the sidebar from it
+        def reload():
+            # Only scan here; the manager's cache is replaced on the UI thread
+            scripts = self.script_manager.scan_scripts()
+            self.after(0, lambda: self._on_scripts_reloaded(scripts, script_filename))
+
+        threading.Thread(target=reload, daemon=True).start()
+
+    def _on_scripts_reloaded(self, scripts, script_filename):
+        """Show the rescanned scripts and open the newly generated one."""
+        self.script_manager.set_scripts(scripts)
+        self.scripts = scripts
         self.sidebar.refresh_scripts(self.scripts)
 
         # Find and select the new script
@@ -605,12 +670,18 @@ class App(ctk.CTk):
     def _exit_generator(self):
         """Exit generator mode and restore normal view."""
         self.showing_generator = False
-        for widget in self.main_frame.winfo_children():
-            widget.destroy()
-        self.create_main_area()
+        if self.generator_panel is not None:
+            self.generator_panel.destroy()
+            self.generator_panel = None
+        self.main_frame.grid()
+
+        if self.current_script:
+            self.sidebar.highlight_script(self.current_script["name"])
 
     def show_settings_modal(self):
         """Show settings modal for LLM configuration."""
+        from ui.dialogs.settings_dialog import SettingsDialog
+
         SettingsDialog(self)
 
     def edit_script(self):
@@ -627,7 +698,9 @@ class App(ctk.CTk):
             self.output_console.append_stream(f"Error: Script file not found at {script_path}\n")
             return
 
-        # Open editor dialog
+        # Open editor dialog (imported here, like the generator panel)
+        from ui.dialogs.script_editor_dialog import ScriptEditorDialog
+
         ScriptEditorDialog(
             self,
             self.current_script,
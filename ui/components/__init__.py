@@ -1,5 +1,6 @@
 """UI components package."""
 from .console import Console
+from .file_list import FileList
 from .sidebar import Sidebar
 
-__all__ = ["Console", "Sidebar"]
+__all__ = ["Console", "FileList", "Sidebar"]
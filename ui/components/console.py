@@ -1,14 +1,29 @@
 """Console output widget."""
 import customtkinter as ctk
+import contextlib
+import queue
 import subprocess
 import threading
 import os
 from config.themes import COLORS
 from core.script_executor import get_install_command, get_install_command_list
 
+FLUSH_DELAY_MS = 30  # Streamed output is polled for and written to the widget this often
+MAX_PENDING_CHARS = 1_000_000  # Older buffered output is dropped past this (runaway scripts)
+MAX_LINES = 5000  # Oldest lines are trimmed past this so redraws and memory stay bounded
+FOLLOW_THRESHOLD = 0.98  # Autoscroll only while the view bottom is at least this far down
+LEVEL_TAGS = {"error": "error", "warn": "warn", "warning": "warn"}  # log() level -> text tag
+
 
 class Console(ctk.CTkTextbox):
-    """Console output display with streaming support."""
+    """
+    Console output display with streaming support.
+
+    Streamed text is coalesced: append_stream only queues it, and a timer on
+    the Tk thread writes everything queued in one insert/see cycle every
+    FLUSH_DELAY_MS. The number of redraws follows the timer, not the rate at
+    which a script prints.
+    """
 
     def __init__(self, master, **kwargs):
         super().__init__(
@@ -24,40 +39,131 @@ class Console(ctk.CTkTextbox):
         self.insert("1.0", "Waiting for input...\n")
         self.configure(state="disabled")
 
+        # Colors for log() levels, applied as text tags
+        self.tag_config("error", foreground="#ff6b6b")
+        self.tag_config("warn", foreground="#ffb454")
+
+        # Streamed output waiting for the next flush. Worker threads only put into
+        # the queue; it is drained on the Tk thread by the _poll loop
+        self._pending = queue.SimpleQueue()
+        self.max_lines = MAX_LINES
+        self._writable_depth = 0  # Nesting level of _writable() blocks
+        self._action_bar = None  # Sibling frame the install prompt is packed into; found on first use
+        self.install_frame = None  # Install prompt, built by _ensure_install_frame
+        self.after(FLUSH_DELAY_MS, self._poll)
+
+    def set_max_lines(self, max_lines: int):
+        """
+        Change how many lines the console keeps before trimming the oldest.
+
+        Args:
+            max_lines: Maximum number of lines to keep
+        """
+        self.max_lines = max(1, max_lines)
+        with self._writable():
+            self._trim()
+
     def log(self, message: str, level: str = "info"):
         """
         Log a message to the console.
 
         Args:
             message: Message to log
-            level: Log level (info, error, warning, etc.)
+            level: Log level; "error" and "warn"/"warning" are shown in color
         """
-        self.configure(state="normal")
-        if level == "error":
-            self.insert("end", f"ERROR: {message}\n")
-        else:
-            self.insert("end", f"{message}\n")
-        self.see("end")
-        self.configure(state="disabled")
+        self._write(message + "\n", LEVEL_TAGS.get(level))
 
     def clear(self):
         """Clear the console."""
-        self.configure(state="normal")
-        self.delete("1.0", "end")
-        self.insert("1.0", "")
-        self.configure(state="disabled")
+        self._discard_pending()
+        with self._writable():
+            self.delete("1.0", "end")
 
     def append_stream(self, text: str):
         """
         Append streamed output.
 
+        Text is queued and written with a single insert every FLUSH_DELAY_MS,
+        so chatty scripts don't trigger a redraw per line. Safe to call from
+        worker threads: it makes no Tk calls.
+
         Args:
             text: Text to append
         """
-        self.configure(state="normal")
-        self.insert("end", text)
-        self.see("end")
-        self.configure(state="disabled")
+        self._pending.put(text)
+
+    def _poll(self):
+        """Flush queued output, then check again after FLUSH_DELAY_MS."""
+        self._flush()
+        self.after(FLUSH_DELAY_MS, self._poll)
+
+    def _take_pending(self):
+        """Empty the queue and return its text, keeping at most MAX_PENDING_CHARS."""
+        chunks = []
+        try:
+            while True:
+                chunks.append(self._pending.get_nowait())
+        except queue.Empty:
+            pass
+        return "".join(chunks)[-MAX_PENDING_CHARS:]
+
+    def _flush(self):
+        """Write all queued output at once."""
+        self._write("")
+
+    def _write(self, text: str, tag: str = None):
+        """
+        Append queued output and then text at the end, trim to max_lines and scroll.
+
+        Every write to the console goes through here, so history stays capped
+        and queued stream output always lands before the new text, within a
+        single _writable() block. The view follows the tail only if it was
+        already at the bottom, so reading older output isn't interrupted.
+
+        Args:
+            text: Text to append (may be empty to only flush the queue)
+            tag: Optional text tag to apply to text
+        """
+        pending = self._take_pending()
+        if not pending and not text:
+            return
+        follow = self.yview()[1] >= FOLLOW_THRESHOLD
+        with self._writable():
+            if pending:
+                self.insert("end", pending)
+            if text:
+                self.insert("end", text, tag)
+            self._trim()
+        if follow:
+            self.see("end")
+
+    @contextlib.contextmanager
+    def _writable(self):
+        """
+        Make the widget editable for the duration of the block.
+
+        The state is switched once for the outermost block only, so a batch of
+        edits (or nested writes) costs one configure pair.
+        """
+        if self._writable_depth == 0:
+            self.configure(state="normal")
+        self._writable_depth += 1
+        try:
+            yield
+        finally:
+            self._writable_depth -= 1
+            if self._writable_depth == 0:
+                self.configure(state="disabled")
+
+    def _trim(self):
+        """Delete the oldest lines beyond max_lines (the widget must be in normal state)."""
+        lines = int(self.index("end-1c").split(".")[0])
+        if lines > self.max_lines:
+            self.delete("1.0", f"{lines - self.max_lines + 1}.0")
+
+    def _discard_pending(self):
+        """Drop queued output that the widget is about to be cleared of anyway."""
+        self._take_pending()
 
     def initialize_script(self, script_name: str, output_path: str):
         """
@@ -67,12 +173,10 @@ class Console(ctk.CTkTextbox):
             script_name: Name of the script being run
             output_path: Output directory path
         """
-        self.configure(state="normal")
-        self.delete("1.0", "end")
-        self.insert("end", f"> Initializing {script_name}...\n")
-        self.insert("end", f"> Output Path: {output_path}\n\n")
-        self.see("end")
-        self.configure(state="disabled")
+        self._discard_pending()
+        with self._writable():
+            self.delete("1.0", "end")
+            self._write(f"> Initializing {script_name}...\n> Output Path: {output_path}\n\n")
 
     def show_success(self, output_dir: str = None):
         """
@@ -81,12 +185,10 @@ class Console(ctk.CTkTextbox):
         Args:
             output_dir: Output directory to show (optional)
         """
-        self.configure(state="normal")
-        self.insert("end", "\n> SUCCESS: Task completed.\n")
+        text = "\n> SUCCESS: Task completed.\n"
         if output_dir:
-            self.insert("end", "> Opening output folder...\n")
-        self.see("end")
-        self.configure(state="disabled")
+            text += "> Opening output folder...\n"
+        self._write(text)
 
     def show_failure(self, return_code: int):
         """
@@ -95,10 +197,7 @@ class Console(ctk.CTkTextbox):
         Args:
             return_code: Process exit code
         """
-        self.configure(state="normal")
-        self.insert("end", f"\n> FAILED: Exit code {return_code}.\n")
-        self.see("end")
-        self.configure(state="disabled")
+        self._write(f"\n> FAILED: Exit code {return_code}.\n")
 
     def show_install_button(self, package_name: str, install_command: str, on_install):
         """
@@ -109,67 +208,83 @@ class Console(ctk.CTkTextbox):
             install_command: Installation command (e.g., "uv add package")
             on_install: Callback when user clicks install
         """
-        # Remove existing install frame if present
-        if hasattr(self, 'install_frame') and self.install_frame:
-            self.install_frame.destroy()
-
-        # The console's master is bottom_frame
-        bottom_frame = self.master
-        if not bottom_frame:
+        if not self._ensure_install_frame():
             return
 
-        # Find the action_bar (first child of bottom_frame that's a CTkFrame and not the console)
-        action_bar = None
-        for child in bottom_frame.winfo_children():
-            if isinstance(child, ctk.CTkFrame) and child != self:
-                action_bar = child
-                break
+        # The prompt is built once and reused; only its texts and command change
+        self._install_msg_label.configure(text=f"❌ Missing package: {package_name}")
+        self._install_info_label.configure(text=f"Install {package_name} to use this script")
+        self._install_btn.configure(
+            state="normal",
+            text="📦 Auto-install",
+            fg_color=COLORS["accent"],
+            hover_color=COLORS["accent_hover"],
+            command=lambda: self._install_package(package_name, install_command, on_install, self._install_btn)
+        )
+        self.install_frame.pack(fill="x", pady=(10, 0))
 
-        if not action_bar:
-            return
+    def _ensure_install_frame(self) -> bool:
+        """
+        Build the (initially hidden) install prompt on first use.
 
-        # Create install frame - pack it into the action_bar (which uses pack)
+        Returns:
+            True if the prompt exists, False if there is no action bar to put it in
+        """
+        if self.install_frame is not None:
+            return True
+
+        # Find the action_bar once (first child of the console's master, bottom_frame,
+        # that's a CTkFrame and not the console)
+        if self._action_bar is None and self.master:
+            self._action_bar = next(
+                (child for child in self.master.winfo_children()
+                 if isinstance(child, ctk.CTkFrame) and child is not self),
+                None
+            )
+        action_bar = self._action_bar
+        if action_bar is None:
+            return False
+
+        # Create install frame - packed into the action_bar (which uses pack) when shown
         self.install_frame = ctk.CTkFrame(action_bar, fg_color=COLORS["bg_card"], corner_radius=6)
-        self.install_frame.pack(fill="x", pady=(10, 0))
 
         # Message
-        msg_label = ctk.CTkLabel(
+        self._install_msg_label = ctk.CTkLabel(
             self.install_frame,
-            text=f"❌ Missing package: {package_name}",
+            text="",
             font=ctk.CTkFont(size=12),
             text_color=COLORS["danger"],
             anchor="w"
         )
-        msg_label.pack(fill="x", padx=10, pady=(8, 4))
+        self._install_msg_label.pack(fill="x", padx=10, pady=(8, 4))
 
         # Instructions
-        info_label = ctk.CTkLabel(
+        self._install_info_label = ctk.CTkLabel(
             self.install_frame,
-            text=f"Install {package_name} to use this script",
+            text="",
             font=ctk.CTkFont(size=11),
             text_color=COLORS["text_sub"],
             anchor="w"
         )
-        info_label.pack(fill="x", padx=10, pady=(0, 8))
+        self._install_info_label.pack(fill="x", padx=10, pady=(0, 8))
 
         # Button frame
         btn_frame = ctk.CTkFrame(self.install_frame, fg_color="transparent")
         btn_frame.pack(fill="x", padx=10, pady=(0, 8))
 
-        # Install button
-        install_btn = ctk.CTkButton(
+        # Install button (command is set by show_install_button)
+        self._install_btn = ctk.CTkButton(
             btn_frame,
-            text=f"📦 Auto-install",
+            text="📦 Auto-install",
             font=ctk.CTkFont(size=12, weight="bold"),
             fg_color=COLORS["accent"],
             hover_color=COLORS["accent_hover"],
-            height=36,
-            command=lambda: self._install_package(package_name, install_command, on_install, install_btn)
+            height=36
         )
-        install_btn.pack(side="left", fill="x", expand=True, padx=(0, 8))
+        self._install_btn.pack(side="left", fill="x", expand=True, padx=(0, 8))
 
         # Dismiss button
-        dismiss_btn = ctk.CTkButton(
+        self._dismiss_btn = ctk.CTkButton(
             btn_frame,
             text="Dismiss",
             width=100,
@@ -178,38 +293,47 @@ class Console(ctk.CTkTextbox):
             fg_color=COLORS["bg_root"],
             hover_color=COLORS["border"],
             text_color=COLORS["text_main"],
-            command=lambda: self._hide_install_frame()
+            command=self._hide_install_frame
         )
-        dismiss_btn.pack(side="right")
+        self._dismiss_btn.pack(side="right")
+        return True
 
     def _install_package(self, package_name: str, install_command: str, on_install, button):
         """Install the package in a background thread."""
         button.configure(state="disabled", text="⏳ Installing...")
-        self.configure(state="normal")
-        self.insert("end", f"\n> Installing {package_name}...\n")
-        self.configure(state="disabled")
-        self.see("end")
+        self._write(f"\n> Installing {package_name}...\n")
 
         def run_install():
             try:
                 # Use the list version of the command (safer than split)
                 install_cmd_list = get_install_command_list(package_name)
-                result = subprocess.run(
+                # Stream the installer's output line by line instead of collecting it all
+                process = subprocess.Popen(
                     install_cmd_list,
-                    capture_output=True,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
                     text=True,
-                    timeout=120
+                    bufsize=1
                 )
-
-                if result.returncode == 0:
+                # Reading stdout blocks, so the 120 s limit is enforced by a timer that kills the installer
+                timer = threading.Timer(120, process.kill)
+                timer.start()
+                try:
+                    for line in process.stdout:
+                        self.append_stream("  " + line)
+                    returncode = process.wait()
+                finally:
+                    timed_out = not timer.is_alive()
+                    timer.cancel()
+
+                if timed_out:
+                    self.after(0, lambda: self._install_error(package_name, "Installation timed out"))
+                elif returncode == 0:
                     # Success
                     self.after(0, lambda: self._install_success(package_name))
                 else:
-                    # Failure
-                    stderr = result.stderr if result.stderr else result.stdout
-                    self.after(0, lambda: self._install_error(package_name, stderr))
-            except subprocess.TimeoutExpired:
-                self.after(0, lambda: self._install_error(package_name, "Installation timed out"))
+                    # Failure (the installer's output is already in the console)
+                    self.after(0, lambda: self._install_error(package_name, f"Exit code {returncode}"))
             except Exception as e:
                 self.after(0, lambda: self._install_error(package_name, str(e)))
             finally:
@@ -221,43 +345,35 @@ class Console(ctk.CTkTextbox):
 
     def _install_success(self, package_name: str):
         """Handle successful installation."""
-        self.configure(state="normal")
-        self.insert("end", f"✓ {package_name} installed successfully!\n")
-        self.insert("end", "\n" + "=" * 60 + "\n")
-        self.insert("end", "🔄 Please relaunch the app to use the new package.\n")
-        self.insert("end", "=" * 60 + "\n")
-        self.see("end")
-        self.configure(state="disabled")
+        rule = "=" * 60 + "\n"
+        self._write(
+            f"✓ {package_name} installed successfully!\n"
+            f"\n{rule}"
+            "🔄 Please relaunch the app to use the new package.\n"
+            f"{rule}"
+        )
 
         # Change the button to show success
-        if hasattr(self, 'install_frame') and self.install_frame:
-            for widget in self.install_frame.winfo_children():
-                if isinstance(widget, ctk.CTkButton):
-                    if "Dismiss" not in widget.cget("text"):
-                        widget.configure(
-                            state="disabled",
-                            text="✓ Installed - Relaunch app",
-                            fg_color=COLORS["success"],
-                            hover_color=COLORS["success_hover"]
-                        )
+        if self.install_frame is not None:
+            self._install_btn.configure(
+                state="disabled",
+                text="✓ Installed - Relaunch app",
+                fg_color=COLORS["success"],
+                hover_color=COLORS["success_hover"]
+            )
 
     def _install_error(self, package_name: str, error_msg: str):
         """Handle installation error."""
-        self.configure(state="normal")
-        self.insert("end", f"\n❌ Installation failed:\n{error_msg}\n")
-        self.insert("end", f"\n📦 Please run manually: {get_install_command(package_name)}\n")
-        self.see("end")
-        self.configure(state="disabled")
+        self._write(
+            f"\n❌ Installation failed:\n{error_msg}\n"
+            f"\n📦 Please run manually: {get_install_command(package_name)}\n"
+        )
 
         # Re-enable the install button
-        if hasattr(self, 'install_frame') and self.install_frame:
-            for widget in self.install_frame.winfo_children():
-                if isinstance(widget, ctk.CTkButton):
-                    if "Dismiss" not in widget.cget("text"):
-                        widget.configure(state="normal", text=f"📦 Auto-install with: {get_install_command(package_name)}")
+        if self.install_frame is not None:
+            self._install_btn.configure(state="normal", text=f"📦 Auto-install with: {get_install_command(package_name)}")
 
     def _hide_install_frame(self):
-        """Hide the install frame."""
-        if hasattr(self, 'install_frame') and self.install_frame:
-            self.install_frame.destroy()
-            self.install_frame = None
+        """Hide the install frame (kept for the next missing package)."""
+        if self.install_frame is not None:
+            self.install_frame.pack_forget()
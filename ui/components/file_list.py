@@ -0,0 +1,178 @@
+"""Virtualized list of selected input files."""
+import os
+import customtkinter as ctk
+from config.themes import COLORS
+
+ROW_HEIGHT = 42  # 28px label + 5px pady above and below (38px row), plus 2px pack pady each side
+
+
+class FileList(ctk.CTkFrame):
+    """
+    Scrollable file list that only creates widgets for the rows on screen.
+
+    A small pool of row widgets is reused: scrolling rebinds the pool to a
+    different slice of the files instead of building widgets for every file.
+    """
+
+    def __init__(self, master, on_remove=None, placeholder_text="No files selected", **kwargs):
+        """
+        Initialize the file list.
+
+        Args:
+            master: Parent widget
+            on_remove: Callback when a row's delete button is clicked (index)
+            placeholder_text: Text shown until files are added
+            **kwargs: Passed to CTkFrame
+        """
+        super().__init__(master, **kwargs)
+        # Keep the requested height; the row pool is sized from it, not the other way round
+        self.pack_propagate(False)
+
+        self.on_remove = on_remove
+        self.files = []
+        self.names = []
+        self.first_visible = 0
+        self.visible_rows = max(1, int(kwargs.get("height", ROW_HEIGHT)) // ROW_HEIGHT)
+        self._row_pool = []
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y", padx=(0, 3), pady=3)
+
+        self.rows_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.rows_frame.pack(side="left", fill="both", expand=True, padx=(5, 0), pady=3)
+        self.rows_frame.pack_propagate(False)
+        self.rows_frame.bind("<Configure>", self._on_resize)
+        self._bind_wheel(self.rows_frame)
+
+        self.placeholder = ctk.CTkLabel(
+            self.rows_frame,
+            text=placeholder_text,
+            text_color=COLORS["border"]
+        )
+        self.placeholder.pack(pady=40)
+        self._bind_wheel(self.placeholder)
+
+    def set_files(self, files, names=None):
+        """
+        Show a new list of files, keeping the scroll position where possible.
+
+        Args:
+            files: List of file paths
+            names: Display names aligned with files (default: their basenames)
+        """
+        self.files = files
+        self.names = names if names is not None else [os.path.basename(f) for f in files]
+        self.placeholder.configure(text="No files selected")
+        self._scroll_to(self.first_visible, force=True)
+
+    # --- Rendering ---
+
+    def _create_row(self):
+        """Create one pooled row; its file is assigned in _render."""
+        frame = ctk.CTkFrame(self.rows_frame, fg_color=COLORS["bg_card"], height=35)
+
+        # Use grid layout with proper column weights
+        frame.grid_columnconfigure(1, weight=1)
+
+        # Icon (fixed width)
+        icon = ctk.CTkLabel(frame, text="📄", width=30, anchor="center")
+        icon.grid(row=0, column=0, padx=(5, 0))
+
+        # Filename (expands, but truncates if too long)
+        lbl = ctk.CTkLabel(
+            frame,
+            text="",
+            anchor="w",
+            font=ctk.CTkFont(size=12),
+            text_color=COLORS["text_main"]
+        )
+        lbl.grid(row=0, column=1, sticky="ew", padx=5, pady=5)
+
+        row = {"frame": frame, "lbl": lbl, "index": None, "packed": False}
+
+        # Delete button (fixed width, always visible); reads the row's current index
+        del_btn = ctk.CTkButton(
+            frame,
+            text="×",
+            width=30,
+            height=25,
+            fg_color="transparent",
+            hover_color=COLORS["danger"],
+            text_color=COLORS["danger"],
+            font=("Arial", 16, "bold"),
+            command=lambda: self._remove_row(row)
+        )
+        del_btn.grid(row=0, column=2, padx=(0, 5), pady=5)
+        row["del_btn"] = del_btn
+
+        for widget in (frame, icon, lbl):
+            self._bind_wheel(widget)
+        return row
+
+    def _render(self):
+        """Bind the row pool to files[first_visible:first_visible + visible_rows]."""
+        count = max(0, min(self.visible_rows, len(self.files) - self.first_visible))
+
+        if count:
+            self.placeholder.pack_forget()
+        while len(self._row_pool) < count:
+            self._row_pool.append(self._create_row())
+
+        for i, row in enumerate(self._row_pool):
+            if i < count:
+                index = self.first_visible + i
+                row["index"] = index
+                name = self.names[index]
+                # Truncate filename if too long (max 40 chars)
+                if len(name) > 40:
+                    name = name[:37] + "..."
+                row["lbl"].configure(text=name)
+                if not row["packed"]:
+                    row["frame"].pack(fill="x", pady=2)
+                    row["packed"] = True
+            elif row["packed"]:
+                row["frame"].pack_forget()
+                row["packed"] = False
+
+        if not count:
+            self.placeholder.pack(pady=40)
+
+        total = len(self.files)
+        if total:
+            self.scrollbar.set(self.first_visible / total, (self.first_visible + count) / total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def _remove_row(self, row):
+        if self.on_remove and row["index"] is not None:
+            self.on_remove(row["index"])
+
+    # --- Scrolling ---
+
+    def _scroll_to(self, first, force=False):
+        first = max(0, min(first, len(self.files) - self.visible_rows))
+        if force or first != self.first_visible:
+            self.first_visible = first
+            self._render()
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self._scroll_to(int(float(value) * len(self.files)))
+        elif action == "scroll":
+            step = self.visible_rows if unit == "pages" else 1
+            self._scroll_to(self.first_visible + int(value) * step)
+
+    def _on_mousewheel(self, event):
+        self._scroll_to(self.first_visible + (-1 if event.delta > 0 else 1))
+
+    def _bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", self._on_mousewheel)
+        # X11 reports the wheel as buttons 4 and 5
+        widget.bind("<Button-4>", lambda event: self._scroll_to(self.first_visible - 1))
+        widget.bind("<Button-5>", lambda event: self._scroll_to(self.first_visible + 1))
+
+    def _on_resize(self, event):
+        visible_rows = max(1, int(event.height // self._apply_widget_scaling(ROW_HEIGHT)))
+        if visible_rows != self.visible_rows:
+            self.visible_rows = visible_rows
+            self._scroll_to(self.first_visible, force=True)